@@ -0,0 +1,77 @@
+"""Simulates a fleet of XMRig HTTP APIs (/1/summary) on loopback.
+
+One listener answers for every worker; the worker is identified by the
+loopback address it was reached on (see synth_stats.worker_ip). Each worker
+is deterministically healthy, slow (sleeps past the probe timeout) or
+offline (connection dropped without a response).
+
+Usage: python fake_xmrig.py [--port 18080] [--latency 0.002] [--jitter 0.001]
+                            [--timeout-ratio 0.01] [--offline-ratio 0.05]
+"""
+import argparse
+import asyncio
+import random
+from aiohttp import web
+
+class FakeFleet:
+    def __init__(self, latency=0.002, jitter=0.001, timeout_ratio=0.0, offline_ratio=0.0, hang=5.0, seed=1):
+        self.latency, self.jitter, self.hang = latency, jitter, hang
+        self.timeout_ratio, self.offline_ratio = timeout_ratio, offline_ratio
+        self.seed = seed
+        self.behaviour = {}
+        self.requests = 0
+
+    def behaviour_for(self, ip):
+        if ip not in self.behaviour:
+            roll = random.Random(f"{self.seed}-{ip}").random()
+            if roll < self.offline_ratio: self.behaviour[ip] = "offline"
+            elif roll < self.offline_ratio + self.timeout_ratio: self.behaviour[ip] = "timeout"
+            else: self.behaviour[ip] = "online"
+        return self.behaviour[ip]
+
+    async def handle_summary(self, request):
+        self.requests += 1
+        ip = request.transport.get_extra_info("sockname")[0]
+        behaviour = self.behaviour_for(ip)
+        if behaviour == "offline":
+            request.transport.close()
+            raise web.HTTPServiceUnavailable()
+        await asyncio.sleep(self.hang if behaviour == "timeout" else self.latency + random.uniform(0, self.jitter))
+        rnd = random.Random(ip)
+        base = rnd.uniform(4000, 30000)
+        return web.json_response({
+            "worker_id": ip, "uptime": rnd.randint(60, 864000),
+            "hashrate": {"total": [base * 1.02, base * 1.01, base]}
+        })
+
+    async def start(self, port=0):
+        """Listens on all addresses so any 127.x.y.z reaches it; non-loopback peers are refused. Returns the port."""
+        @web.middleware
+        async def loopback_only(request, handler):
+            if not (request.remote or "").startswith("127."): raise web.HTTPForbidden()
+            return await handler(request)
+
+        app = web.Application(middlewares=[loopback_only])
+        app.add_routes([web.get('/1/summary', self.handle_summary)])
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "0.0.0.0", port, backlog=4096).start()
+        return self.runner.addresses[0][1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+async def main(args):
+    fleet = FakeFleet(args.latency, args.jitter, args.timeout_ratio, args.offline_ratio)
+    port = await fleet.start(args.port)
+    print(f"Fake XMRig fleet on port {port}", flush=True)
+    await asyncio.Event().wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--timeout-ratio", type=float, default=0.01)
+    parser.add_argument("--offline-ratio", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,118 @@
+"""Runs several dashboards on loopback and checks the federated fleet view.
+
+Each instance gets its own synthetic stats dir, history DB, HOST_IP and port;
+all of them probe one fake XMRig fleet. The first instance federates the
+others (DASHBOARD_PEERS). The script waits until the hub's fleet totals
+equal the sum of every instance's own /api/compact numbers, and with
+--kill-one also stops a peer and waits for the hub to mark it stale.
+
+Usage: python federation_demo.py [--instances 3] [--workers 200] [--base-port 18100]
+                                 [--kill-one] [--keep]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from aiohttp import ClientSession
+import mining_status as ms
+from fake_xmrig import FakeFleet
+from synth_stats import write_stats
+
+def start_instance(root, index, port, xmrig_port, workers, peers):
+    stats_dir = os.path.join(root, f"host{index}")
+    write_stats(stats_dir, workers, seed=index + 1)
+    env = dict(os.environ,
+               STATS_DIR=stats_dir, HISTORY_DB_PATH=os.path.join(stats_dir, "history", "history.db"),
+               DASHBOARD_PORT=str(port), HOST_IP=f"host{index}", XMRIG_API_PORT=str(xmrig_port),
+               XMRIG_PROBE_TARGETS="ip", DASHBOARD_PEERS=",".join(peers))
+    return subprocess.Popen([sys.executable, os.path.join(os.path.dirname(HERE), "mining_status.py")],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+def metric_value(text, name, labels=""):
+    prefix = f"{name}{{{labels}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix): return float(line[len(prefix):])
+    return None
+
+async def get_json(session, url):
+    try:
+        async with session.get(url) as response:
+            return await response.json() if response.status == 200 else None
+    except Exception: return None
+
+async def get_text(session, url):
+    try:
+        async with session.get(url) as response:
+            return await response.text() if response.status == 200 else ""
+    except Exception: return ""
+
+async def wait_for(check, timeout, what):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = await check()
+        if result: return result
+        await asyncio.sleep(1)
+    raise SystemExit(f"Timed out waiting for {what}")
+
+async def main(args):
+    fleet = FakeFleet(offline_ratio=0.1)
+    xmrig_port = await fleet.start()
+    urls = [f"http://127.0.0.1:{args.base_port + i}" for i in range(args.instances)]
+    with tempfile.TemporaryDirectory(prefix="dashboard-federation-") as root:
+        procs = [start_instance(root, i, args.base_port + i, xmrig_port, args.workers, urls[1:] if i == 0 else [])
+                 for i in range(args.instances)]
+        try:
+            async with ClientSession() as session:
+                async def merged():
+                    compacts = await asyncio.gather(*(get_json(session, f"{url}/api/compact") for url in urls))
+                    if not all(c and c["workers"]["total"] for c in compacts): return None
+                    metrics = await get_text(session, f"{urls[0]}/metrics")
+                    fleet_workers = await get_json(session, f"{urls[0]}/api/workers?scope=fleet&per_page=1")
+                    expected_h15 = sum(c["total_h15"] for c in compacts)
+                    expected_workers = sum(c["workers"]["total"] for c in compacts)
+                    if metric_value(metrics, "dashboard_fleet_hashrate") != expected_h15: return None
+                    if not fleet_workers or fleet_workers["total"] != expected_workers: return None
+                    return compacts, expected_h15, expected_workers
+
+                compacts, h15, workers = await wait_for(merged, 90, "merged fleet totals")
+                for url, c in zip(urls, compacts):
+                    print(f"  {url}  {c['host']:<8} {ms.format_hr(c['total_h15']):>14}  workers {c['workers']['online']}/{c['workers']['total']}")
+                print(f"Fleet on {urls[0]}: {ms.format_hr(h15)} across {workers} workers (matches the sum of {len(urls)} hosts)")
+                history = await get_json(session, f"{urls[0]}/api/history?series=fleet&range=1h")
+                print(f"Fleet history: {len(history['values']) if history else 0} point(s) at {history['step'] if history else '-'}s")
+
+                if args.kill_one and len(procs) > 1:
+                    procs[-1].terminate()
+                    peer = urls[-1]
+                    print(f"Stopped {peer}; waiting for the hub to mark it stale (~{ms.FEDERATION_STALE}s)")
+                    async def stale():
+                        metrics = await get_text(session, f"{urls[0]}/metrics")
+                        return metric_value(metrics, "dashboard_federation_peer_up", f'peer="{peer}"') == 0
+                    await wait_for(stale, ms.FEDERATION_STALE + 30, "the stopped peer to go stale")
+                    fleet_workers = await get_json(session, f"{urls[0]}/api/workers?scope=fleet&per_page=1")
+                    print(f"Peer marked stale; fleet table now lists {fleet_workers['total']} workers")
+
+                if args.keep:
+                    print(f"Dashboards running; open {urls[0]} (Ctrl+C to stop)")
+                    await asyncio.Event().wait()
+        finally:
+            for proc in procs:
+                proc.terminate()
+                proc.wait()
+            await fleet.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--base-port", type=int, default=18100)
+    parser.add_argument("--kill-one", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    asyncio.run(main(parser.parse_args()))
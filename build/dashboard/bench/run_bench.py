@@ -0,0 +1,216 @@
+"""Benchmarks mining_status.py as the farm grows.
+
+For each worker count it writes synthetic p2pool stats to a temp dir, points
+the dashboard at a fake XMRig fleet on loopback, then measures:
+  * one full collection cycle (collect_once), cold and warm, with per-stage means,
+    checking after each that the workers seen online match the fleet's behaviour map
+  * a cold page render
+  * GET /, /api/snapshot and a sorted /api/workers page: throughput and
+    latency (gzip), plus 304 revalidation of the page
+
+Results are appended to results.jsonl next to this file and compared with the
+previous run of the same scenario, config and host so regressions stand out;
+runs with no matching baseline are reported but not compared. An online count
+that differs from the expected one is always flagged.
+
+Usage: python run_bench.py [--workers 10,100,1000,5000] [--requests 500]
+                           [--concurrency 32] [--no-record]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from aiohttp import web, ClientSession, TCPConnector
+import mining_status as ms
+from fake_xmrig import FakeFleet
+from synth_stats import write_stats, worker_ip
+
+RESULTS_PATH = os.path.join(HERE, "results.jsonl")
+REGRESSION_THRESHOLD = 0.20
+
+def configure(stats_dir, xmrig_port):
+    """Points the dashboard module at the temp stats dir and the fake fleet."""
+    ms.STATS_FILES.update({
+        "p2p": os.path.join(stats_dir, "local", "p2p"),
+        "pool": os.path.join(stats_dir, "pool", "stats"),
+        "network": os.path.join(stats_dir, "network", "stats"),
+        "tari": os.path.join(stats_dir, "local", "merge_mining"),
+        "stratum": os.path.join(stats_dir, "local", "stratum"),
+    })
+    ms.DISK_PATH = stats_dir
+    ms.HISTORY_DB_PATH = os.path.join(stats_dir, "history", "history.db")
+    ms.XMRIG_API_PORT = xmrig_port
+    ms.XMRIG_PROBE_TARGETS = ["ip"]
+    ms.LATEST_DATA = {}
+    ms.STAGE_TIMINGS.clear()
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0
+
+async def load(url, requests, concurrency, headers):
+    """Issues `requests` GETs with `concurrency` in flight; returns (rps, latencies in seconds, statuses)."""
+    latencies, statuses = [], {}
+    remaining = iter(range(requests))
+    async with ClientSession(connector=TCPConnector(limit=concurrency), auto_decompress=False) as session:
+        async def client():
+            for _ in remaining:
+                started = time.perf_counter()
+                async with session.get(url, headers=headers) as response:
+                    await response.read()
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, latencies, statuses
+
+def http_metrics(prefix, rps, latencies):
+    return {
+        f"{prefix}_rps": round(rps, 1),
+        f"{prefix}_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        f"{prefix}_p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        f"{prefix}_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+async def run_scenario(workers, fleet, fleet_port, args):
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as stats_dir:
+        write_stats(stats_dir, workers)
+        configure(stats_dir, fleet_port)
+        await ms.init_state()
+        try:
+            result = {"workers_expected": sum(fleet.behaviour_for(worker_ip(i)) == "online" for i in range(workers))}
+            started = time.perf_counter()
+            await ms.collect_once()
+            result["cycle_cold_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            result["workers_online_cold"] = ms.LATEST_DATA["workers"]["online"]
+            # Probe every worker again so the warm cycle measures real probes, not skipped backoffs.
+            ms.PROBER.backoff.clear()
+            started = time.perf_counter()
+            await ms.collect_once()
+            result["cycle_warm_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            for stage, h in sorted(ms.STAGE_TIMINGS.items()):
+                result[f"stage_{stage}_mean_ms"] = round(h.sum / h.count * 1000, 3)
+            result["workers_online"] = ms.LATEST_DATA["workers"]["online"]
+
+            renders = 20
+            started = time.perf_counter()
+            for _ in range(renders):
+                ms.render_page(ms.build_view(ms.LATEST_DATA))
+            result["render_page_ms"] = round((time.perf_counter() - started) / renders * 1000, 3)
+
+            runner = web.AppRunner(ms.build_app(collect=False), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", 0).start()
+            base = f"http://127.0.0.1:{runner.addresses[0][1]}"
+            try:
+                gzip_headers = {"Accept-Encoding": "gzip"}
+                for path, prefix in (("/", "page"), ("/api/snapshot", "snapshot"), ("/api/workers?sort=hashrate&desc=1&page=2", "workers_page")):
+                    rps, latencies, _ = await load(base + path, args.requests, args.concurrency, gzip_headers)
+                    result.update(http_metrics(prefix, rps, latencies))
+                etag = ms.RENDER_CACHE.entries["page"][1].etag
+                rps, latencies, statuses = await load(base + "/", args.requests, args.concurrency, {**gzip_headers, "If-None-Match": etag})
+                result.update(http_metrics("page_304", rps, latencies))
+                result["page_304_ratio"] = round(statuses.get(304, 0) / args.requests, 3)
+                result["page_gzip_bytes"] = len(ms.RENDER_CACHE.entries["page"][1].gzip)
+            finally:
+                await runner.cleanup()
+            return result
+        finally:
+            await ms.close_state()
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def baseline_key(scenario, config, host):
+    """Runs are only comparable on the same machine with the same load settings."""
+    return scenario, json.dumps(config, sort_keys=True), host
+
+def previous_results():
+    """Latest recorded metrics per (scenario, config, host)."""
+    previous = {}
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    key = baseline_key(record["scenario"], record.get("config"), record.get("host"))
+                    previous[key] = record["metrics"]
+    return previous
+
+def compare(metrics, before):
+    """Yields (metric, old, new, change, regressed) for metrics present in both runs."""
+    for key, new in metrics.items():
+        old = before.get(key)
+        if not isinstance(old, (int, float)) or not old: continue
+        change = (new - old) / old
+        if key.endswith("_rps"): regressed = change < -REGRESSION_THRESHOLD
+        elif key.endswith("_ms") or key.endswith("_bytes"): regressed = change > REGRESSION_THRESHOLD
+        else: regressed = False
+        yield key, old, new, change, regressed
+
+async def main(args):
+    fleet = FakeFleet(args.latency, args.jitter, args.timeout_ratio, args.offline_ratio)
+    fleet_port = await fleet.start()
+    previous = previous_results()
+    host = platform.node()
+    config = {
+        "latency": args.latency, "timeout_ratio": args.timeout_ratio, "offline_ratio": args.offline_ratio,
+        "requests": args.requests, "concurrency": args.concurrency
+    }
+    records, regressions = [], 0
+    try:
+        for workers in args.workers:
+            scenario = f"workers={workers}"
+            metrics = await run_scenario(workers, fleet, fleet_port, args)
+            print(f"\n== {scenario}")
+            for key in ("workers_online_cold", "workers_online"):
+                if metrics[key] != metrics["workers_expected"]:
+                    print(f"  MISMATCH: {key}={metrics[key]}, expected {metrics['workers_expected']} online")
+                    regressions += 1
+            before = previous.get(baseline_key(scenario, config, host), {})
+            if not before:
+                print(f"  (no baseline for this config on {host}; not compared)")
+            changes = {key: (change, regressed) for key, _, _, change, regressed in compare(metrics, before)}
+            for key, value in metrics.items():
+                change, regressed = changes.get(key, (None, False))
+                note = f"{change:+.1%}" if change is not None else ""
+                print(f"  {key:<32} {value:>12} {note:>8}{'  REGRESSION' if regressed else ''}")
+                regressions += regressed
+            records.append({
+                "ts": int(time.time()), "git": git_revision(), "python": platform.python_version(), "host": host,
+                "scenario": scenario, "config": config, "metrics": metrics
+            })
+    finally:
+        await fleet.stop()
+
+    if args.record:
+        with open(RESULTS_PATH, "a") as f:
+            for record in records: f.write(json.dumps(record) + "\n")
+        print(f"\nRecorded {len(records)} scenario(s) to {RESULTS_PATH}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the mining dashboard on loopback.")
+    parser.add_argument("--workers", type=lambda v: [int(n) for n in v.split(",")], default=[10, 100, 1000, 5000])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--timeout-ratio", type=float, default=0.01)
+    parser.add_argument("--offline-ratio", type=float, default=0.05)
+    parser.add_argument("--no-record", dest="record", action="store_false")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,65 @@
+"""Writes synthetic p2pool --data-api files for benchmarking the dashboard.
+
+Usage: python synth_stats.py <stats_dir> <workers>
+"""
+import json
+import os
+import random
+import sys
+import time
+
+def worker_ip(i):
+    """Loopback address for worker i (all of 127.0.0.0/8 routes to lo on Linux)."""
+    return f"127.1.{i // 250}.{i % 250 + 1}"
+
+def worker_name(i):
+    return f"rig{i:05d}"
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def write_stats(stats_dir, workers, seed=1):
+    """Writes local/stratum (with `workers` entries), local/p2p, local/merge_mining, pool/stats and network/stats."""
+    rnd = random.Random(seed)
+    now = int(time.time())
+    entries = []
+    total = 0
+    for i in range(workers):
+        hashrate = rnd.randint(4000, 30000)
+        total += hashrate
+        # ip:port,uptime,difficulty,hashrate,name, as p2pool reports stratum workers
+        entries.append(f"{worker_ip(i)}:{rnd.randint(30000, 60000)},{rnd.randint(60, 864000)},{rnd.randint(100000, 900000)},{hashrate},{worker_name(i)}")
+
+    write_json(os.path.join(stats_dir, "local", "stratum"), {
+        "hashrate_15m": total, "hashrate_1h": total, "hashrate_24h": total,
+        "total_hashes": total * 86400, "shares_found": rnd.randint(0, 500), "shares_failed": rnd.randint(0, 5),
+        "average_effort": rnd.uniform(50, 150), "current_effort": rnd.uniform(0, 200),
+        "connections": workers, "incoming_connections": workers,
+        "block_reward_share_percent": rnd.uniform(0, 5), "last_share_found_time": now - rnd.randint(0, 3600),
+        "wallet": "4" + "A" * 94, "workers": entries
+    })
+    write_json(os.path.join(stats_dir, "local", "p2p"), {
+        "connections": 24, "incoming_connections": 12, "peer_list_size": 1200, "uptime": 86400,
+        "zmq_last_active": 1, "peers": [f"10.0.{i // 250}.{i % 250}:37889" for i in range(24)]
+    })
+    write_json(os.path.join(stats_dir, "local", "merge_mining"), {
+        "chains": [{"channel_state": "OK", "wallet": "12" + "B" * 60, "height": 100000, "reward": 12_000_000_000, "difficulty": 10**12}]
+    })
+    write_json(os.path.join(stats_dir, "pool", "stats"), {
+        "pool_statistics": {
+            "hashRate": total * 50, "miners": workers * 10, "totalBlocksFound": 4000, "sidechainHeight": 10_000_000,
+            "totalHashes": 10**19, "lastBlockFound": 3_300_000, "lastBlockFoundTime": now - 600,
+            "pplnsWeight": 10**15, "pplnsWindowSize": 2160, "sidechainDifficulty": 10**10
+        }
+    })
+    write_json(os.path.join(stats_dir, "network", "stats"), {
+        "difficulty": 400_000_000_000, "height": 3_300_000, "reward": 600_000_000_000,
+        "hash": "ab" * 32, "timestamp": now
+    })
+
+if __name__ == "__main__":
+    write_stats(sys.argv[1], int(sys.argv[2]))
@@ -1,26 +1,117 @@
+import gzip
+import hashlib
+import html
 import json
+import mimetypes
 import os
 import shutil
+import sqlite3
+import threading
 import time
 import asyncio
-from aiohttp import web, ClientSession, ClientTimeout
+import ctypes
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web, ClientSession, ClientTimeout, TCPConnector
 from datetime import timedelta, datetime
+from email.utils import formatdate
+
+try: import brotli
+except ImportError: brotli = None
 
 # --- CONFIGURATION ---
-BASE_STATS_DIR = "/app/stats"
+BASE_STATS_DIR = os.environ.get("STATS_DIR", "/app/stats")
 STRATUM_STATS_PATH = f"{BASE_STATS_DIR}/local/stratum"
 TARI_STATS_PATH = f"{BASE_STATS_DIR}/local/merge_mining"
 P2P_STATS_PATH = f"{BASE_STATS_DIR}/local/p2p"
 POOL_STATS_PATH = f"{BASE_STATS_DIR}/pool/stats"
 NETWORK_STATS_PATH = f"{BASE_STATS_DIR}/network/stats"
+STATS_FILES = {
+    "p2p": P2P_STATS_PATH,
+    "pool": POOL_STATS_PATH,
+    "network": NETWORK_STATS_PATH,
+    "tari": TARI_STATS_PATH,
+    "stratum": STRATUM_STATS_PATH,
+}
 
 DISK_PATH = '/data'
-XMRIG_API_PORT = 8080
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", "/app/history/history.db")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+CHART_JS_CDN = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"
+XMRIG_API_PORT = int(os.environ.get("XMRIG_API_PORT", 8080))
 API_TIMEOUT = 1         
 UPDATE_INTERVAL = 30 
+PROBE_CONCURRENCY = 64
+# Order of targets tried for a worker's XMRig API: hostname, mDNS (.local) and stratum IP.
+XMRIG_PROBE_TARGETS = [t.strip().lower() for t in os.environ.get("XMRIG_PROBE_TARGETS", "name,local,ip").split(",") if t.strip()]
+if not XMRIG_PROBE_TARGETS or not set(XMRIG_PROBE_TARGETS) <= {"name", "local", "ip"}:
+    print(f"Ignoring invalid XMRIG_PROBE_TARGETS={XMRIG_PROBE_TARGETS} (use name, local, ip)", flush=True)
+    XMRIG_PROBE_TARGETS = [t for t in XMRIG_PROBE_TARGETS if t in ("name", "local", "ip")] or ["name", "local", "ip"]
+PROBE_BACKOFF_MAX = 600
+# Consecutive failed probes before a worker is backed off; one miss is usually transient.
+PROBE_BACKOFF_AFTER = 3
+# Threads for stats files, /proc, disk and SQLite; kept apart from the default executor,
+# which aiohttp's threaded resolver fills with (possibly slow) rig hostname lookups.
+BLOCKING_THREADS = 4
+SSE_QUEUE_SIZE = 32
+SSE_HEARTBEAT = 15
+WORKERS_PAGE_SIZE = 50
+WORKERS_PAGE_MAX = 500
+METRIC_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DASHBOARD_PORT = int(os.environ.get("DASHBOARD_PORT", 8000))
+# Federation: base URLs of other dashboards (e.g. http://10.0.0.5:8000) merged into a fleet view.
+FEDERATION_PEERS = [p.strip().rstrip("/") for p in os.environ.get("DASHBOARD_PEERS", "").split(",") if p.strip()]
+FEDERATION_TIMEOUT = 3
+FEDERATION_STALE = 30
+FEDERATION_HISTORY_TTL = 60
+
+# Per-source schedule: name -> (interval seconds, timeout seconds).
+COLLECTOR_SCHEDULE = {
+    "system": (10, 5),
+    "disk": (60, 10),
+    "p2p": (5, 5),
+    "pool": (5, 5),
+    "network": (5, 5),
+    "tari": (10, 5),
+    "stratum": (5, 5),
+    "workers": (UPDATE_INTERVAL, UPDATE_INTERVAL),
+    "history": (30, 10),
+    "federation": (5, FEDERATION_TIMEOUT + 1),
+}
+
+# Rollup tiers for the history store: (bucket seconds, retention seconds).
+HISTORY_TIERS = [
+    (30, 2 * 86400),
+    (300, 14 * 86400),
+    (3600, 180 * 86400),
+    (86400, 5 * 365 * 86400),
+]
+# Per-worker series ("worker:<name>@<ip>") get fewer, shorter tiers: about 1.2k rows
+# (~105 KB of SQLite) per rig instead of ~16k, and series of rigs that left age out within two weeks.
+WORKER_HISTORY_PREFIX = "worker:"
+WORKER_HISTORY_TIERS = [
+    (30, 2 * 3600),
+    (300, 2 * 86400),
+    (3600, 14 * 86400),
+]
+HISTORY_MAX_POINTS = 500
+HISTORY_RANGES = {"1h": 3600, "6h": 6 * 3600, "24h": 86400, "7d": 7 * 86400, "30d": 30 * 86400}
 
 LATEST_DATA = {}
-HASHRATE_HISTORY = []
+SNAPSHOT_VERSION = 0
+SNAPSHOT_TIME = time.time()
+HISTORY = None
+PROBER = None
+COLLECTORS = {}
+STATS_CACHE = None
+RENDER_CACHE = None
+BROADCASTER = None
+STAGE_TIMINGS = {}
+WORKERS = None
+ASSETS = None
+FEDERATION = None
+FLEET_WORKERS = None
+BLOCKING_EXECUTOR = None
 
 def format_hr(h):
     try:
@@ -53,28 +144,194 @@ def format_uptime(seconds):
     try: return str(timedelta(seconds=int(seconds)))
     except: return "Unknown"
 
-async def get_worker_live_stats(session, name, ip_with_port):
-    ip = ip_with_port.split(':')[0]
-    targets = [name, name + ".local", ip]
-    timeout = ClientTimeout(total=API_TIMEOUT)
-    
-    for target in targets:
-        url = f"http://{target}:{XMRIG_API_PORT}/1/summary"
+class HistoryStore:
+    """Downsampled hashrate time-series kept in SQLite (WAL).
+
+    Every sample is folded into one bucket per tier, so a write costs a fixed
+    number of upserts per series and old buckets age out per tier retention.
+    Range queries pick the finest tier that fits in max_points.
+    """
+
+    def __init__(self, path):
         try:
-            async with session.get(url, timeout=timeout) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    hr_obj = data.get("hashrate", {})
-                    hashrates = hr_obj.get("total", [0, 0, 0]) 
-                    return {
-                        "h10": hashrates[0] if len(hashrates) > 0 else 0,
-                        "h60": hashrates[1] if len(hashrates) > 1 else 0,
-                        "h15": hashrates[2] if len(hashrates) > 2 else 0,
-                        "uptime": data.get("uptime", 0),
-                        "name": data.get("worker_id", "miner")
-                    }
-        except: continue
-    return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+        except Exception as e:
+            print(f"History store unavailable at {path} ({e}), using memory", flush=True)
+            self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.last_prune = 0
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " tier INTEGER NOT NULL, series TEXT NOT NULL, bucket INTEGER NOT NULL,"
+                " total REAL NOT NULL, n INTEGER NOT NULL,"
+                " PRIMARY KEY (tier, series, bucket)) WITHOUT ROWID"
+            )
+            # Pruning deletes by (tier, bucket) across every series; the primary key alone would scan the whole tier.
+            self.db.execute("CREATE INDEX IF NOT EXISTS samples_tier_bucket ON samples (tier, bucket)")
+            self.db.commit()
+
+    def record(self, ts, values):
+        """Adds one sample per series ({series: value}) at unix time ts."""
+        rows = []
+        for series, value in values.items():
+            for step, _ in history_tiers(series):
+                rows.append((step, series, int(ts) - int(ts) % step, float(value or 0)))
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO samples (tier, series, bucket, total, n) VALUES (?, ?, ?, ?, 1)"
+                " ON CONFLICT (tier, series, bucket) DO UPDATE SET total = total + excluded.total, n = n + 1",
+                rows,
+            )
+            # Retention is coarse, so pruning once per 5m bucket is plenty.
+            if ts - self.last_prune >= HISTORY_TIERS[1][0]:
+                for step, retention in HISTORY_TIERS:
+                    self.db.execute("DELETE FROM samples WHERE tier = ? AND bucket < ?", (step, ts - retention))
+                # ';' sorts right after ':', so this range is exactly the worker series.
+                for step, retention in WORKER_HISTORY_TIERS:
+                    self.db.execute(
+                        "DELETE FROM samples WHERE tier = ? AND bucket < ? AND series >= ? AND series < ?",
+                        (step, ts - retention, WORKER_HISTORY_PREFIX, WORKER_HISTORY_PREFIX[:-1] + ";"),
+                    )
+                self.last_prune = ts
+            self.db.commit()
+
+    def query(self, series, start, end, max_points=HISTORY_MAX_POINTS):
+        """Returns (bucket seconds, [(bucket_ts, avg_value), ...]) for series between start and end."""
+        now = time.time()
+        tiers = history_tiers(series)
+        step = tiers[-1][0]
+        for tier_step, retention in tiers:
+            if (end - start) / tier_step <= max_points and start >= now - retention:
+                step = tier_step
+                break
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT bucket, total / n FROM samples WHERE tier = ? AND series = ? AND bucket BETWEEN ? AND ?"
+                " ORDER BY bucket LIMIT ?",
+                (step, series, int(start) - int(start) % step, int(end), max_points + 1),
+            ).fetchall()
+        return step, rows
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def history_tiers(series):
+    """Rollup tiers kept for a series."""
+    return WORKER_HISTORY_TIERS if series.startswith(WORKER_HISTORY_PREFIX) else HISTORY_TIERS
+
+def history_range(name):
+    """Maps a ?range= value to seconds, falling back to 24h."""
+    return HISTORY_RANGES.get(name, HISTORY_RANGES["24h"])
+
+def history_points(series, seconds):
+    """Chart-ready labels/values for the last `seconds` of a series."""
+    now = time.time()
+    step, rows = HISTORY.query(series, now - seconds, now) if HISTORY else (HISTORY_TIERS[0][0], [])
+    return chart_points(step, seconds, rows)
+
+def chart_points(step, seconds, rows):
+    fmt = '%H:%M' if seconds <= 86400 else '%m-%d %H:%M'
+    return {
+        "step": step,
+        "seconds": seconds,
+        "labels": [time.strftime(fmt, time.localtime(t)) for t, _ in rows],
+        "ts": [t for t, _ in rows],
+        "values": [round(v, 2) for _, v in rows],
+    }
+
+class XmrigProber:
+    """Long-lived XMRig API client shared by every collection cycle.
+
+    Keeps one keep-alive connector for all rigs, remembers which target
+    (hostname, .local or IP) last answered for each worker and backs off
+    exponentially on workers that stay offline. In-flight requests are capped
+    by a semaphore and API_TIMEOUT only starts once a slot is held, so rigs
+    queued behind a large farm are not timed out before they are asked.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.slots = None
+        # All keyed by stratum endpoint (ip:port): names are often shared or empty.
+        self.targets = {}   # endpoint -> target that last answered
+        self.backoff = {}   # endpoint -> (consecutive failures, monotonic time of next probe)
+        self.latency = {}   # endpoint -> seconds taken by the last successful probe
+        self.outcomes = {}  # endpoint -> {"success"|"timeout"|"error"|"backoff": count}
+
+    def count(self, endpoint, outcome):
+        counts = self.outcomes.setdefault(endpoint, {"success": 0, "timeout": 0, "error": 0, "backoff": 0})
+        counts[outcome] += 1
+
+    async def start(self):
+        connector = TCPConnector(limit=PROBE_CONCURRENCY, ttl_dns_cache=300, keepalive_timeout=UPDATE_INTERVAL * 2)
+        self.session = ClientSession(connector=connector)
+        self.slots = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+    async def close(self):
+        if self.session: await self.session.close()
+
+    def candidates(self, name, endpoint):
+        ip = endpoint.split(':')[0]
+        targets = [{"name": name, "local": name + ".local" if name else "", "ip": ip}[t] for t in XMRIG_PROBE_TARGETS]
+        targets = [t for t in targets if t]
+        cached = self.targets.get(endpoint)
+        if cached in targets:
+            targets.remove(cached)
+            targets.insert(0, cached)
+        return targets
+
+    async def probe(self, name, endpoint):
+        """Returns live stats for the worker on a stratum endpoint, or None if offline or backing off."""
+        now = time.monotonic()
+        failures, next_probe = self.backoff.get(endpoint, (0, 0))
+        if now < next_probe:
+            self.count(endpoint, "backoff")
+            return None
+
+        timed_out = False
+        for target in self.candidates(name, endpoint):
+            url = f"http://{target}:{XMRIG_API_PORT}/1/summary"
+            try:
+                async with self.slots:
+                    started = time.monotonic()
+                    async with self.session.get(url, timeout=ClientTimeout(total=API_TIMEOUT)) as response:
+                        if response.status != 200: continue
+                        data = await response.json(content_type=None)
+            except asyncio.TimeoutError:
+                timed_out = True
+                continue
+            except Exception: continue
+            self.count(endpoint, "success")
+            self.latency[endpoint] = time.monotonic() - started
+            self.targets[endpoint] = target
+            self.backoff.pop(endpoint, None)
+            hashrates = data.get("hashrate", {}).get("total", [0, 0, 0])
+            return {
+                "h10": hashrates[0] if len(hashrates) > 0 else 0,
+                "h60": hashrates[1] if len(hashrates) > 1 else 0,
+                "h15": hashrates[2] if len(hashrates) > 2 else 0,
+                "uptime": data.get("uptime", 0),
+                "name": data.get("worker_id", "miner")
+            }
+
+        self.count(endpoint, "timeout" if timed_out else "error")
+        self.targets.pop(endpoint, None)
+        self.latency.pop(endpoint, None)
+        failures += 1
+        # The first delay spans two collector intervals so the very next cycle is actually skipped.
+        delay = min(UPDATE_INTERVAL * 2 ** (failures - PROBE_BACKOFF_AFTER + 1), PROBE_BACKOFF_MAX) if failures >= PROBE_BACKOFF_AFTER else 0
+        self.backoff[endpoint] = (failures, now + delay)
+        return None
+
+    def forget(self, endpoints):
+        """Drops cached state for endpoints no longer reported by stratum."""
+        for cache in (self.targets, self.backoff, self.latency, self.outcomes):
+            for endpoint in [e for e in cache if e not in endpoints]: del cache[endpoint]
 
 def get_disk_usage(path="/"):
     try:
@@ -84,9 +341,11 @@ def get_disk_usage(path="/"):
             "total": f"{usage.total / (1024**3):.1f} GB",
             "used": f"{usage.used / (1024**3):.1f} GB",
             "percent": f"{percent:.1f}%",
-            "percent_val": percent
+            "percent_val": percent,
+            "total_bytes": usage.total,
+            "used_bytes": usage.used
         }
-    except: return {"total": "N/A", "used": "N/A", "percent": "0%", "percent_val": 0}
+    except: return {"total": "N/A", "used": "N/A", "percent": "0%", "percent_val": 0, "total_bytes": 0, "used_bytes": 0}
 
 def detect_pool_type(peers):
     """Detects Main/Mini/Nano based on peer ports."""
@@ -98,306 +357,1189 @@ def detect_pool_type(peers):
     winner = max(counts, key=counts.get)
     return winner if counts[winner] > 0 else "Unknown"
 
-async def update_data_loop():
-    global LATEST_DATA, HASHRATE_HISTORY
-    while True:
-        data = {
-            "host_ip": os.environ.get("HOST_IP", "Unknown Host"),
-            "now": time.strftime('%Y-%m-%d %H:%M:%S'),
-            "system": {"hp_status": "Unknown", "hp_val": "0/0", "hp_class": "status-warn"},
-            "disk": get_disk_usage(DISK_PATH),
-            "tari": None,
-            "p2p": {
-                "pool_type": "Initializing...", "connections": 0, "incoming": 0,
-                "peers": 0, "uptime": "0", "zmq": 0
-            },
-            "pool": {
-                "hashrate": "0 H/s", "miners": 0, "blocks": 0, "sidechain_height": 0,
-                "total_hashes": 0, "last_block_found": "N/A", "last_block_ts": 0,
-                "pplns_weight": 0, "pplns_window": 0, "diff": 0
-            },
-            "network": {"difficulty": 0, "height": 0, "reward": 0, "hash": "N/A", "ts": 0},
-            "stratum": {},
-            "workers": [],
-            "total_live_h15": 0
+def default_snapshot():
+    return {
+        "host_ip": os.environ.get("HOST_IP", "Unknown Host"),
+        "now": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "system": {"hp_status": "Unknown", "hp_val": "0/0", "hp_class": "status-warn", "hp_total": 0, "hp_free": 0},
+        "disk": {"total": "N/A", "used": "N/A", "percent": "0%", "percent_val": 0, "total_bytes": 0, "used_bytes": 0},
+        "tari": None,
+        "p2p": {
+            "pool_type": "Initializing...", "connections": 0, "incoming": 0,
+            "peers": 0, "uptime": "0", "zmq": 0
+        },
+        "pool": {
+            "hashrate": "0 H/s", "hashrate_val": 0, "miners": 0, "blocks": 0, "sidechain_height": 0,
+            "total_hashes": 0, "last_block_found": "N/A", "last_block_ts": 0,
+            "pplns_weight": 0, "pplns_window": 0, "diff": 0
+        },
+        "network": {"difficulty": 0, "height": 0, "reward": 0, "hash": "N/A", "ts": 0},
+        "stratum": {},
+        "workers": WorkerTable().summary,
+        "workers_version": 0,
+        "fleet_workers_version": 0,
+        "total_live_h15": 0
+    }
+
+def publish(updates):
+    """Merges a collector's sections into a fresh LATEST_DATA dict (copy-on-write)."""
+    global LATEST_DATA, SNAPSHOT_VERSION, SNAPSHOT_TIME
+    data = dict(LATEST_DATA or default_snapshot())
+    data.update(updates)
+    data["now"] = time.strftime('%Y-%m-%d %H:%M:%S')
+    LATEST_DATA = data
+    SNAPSHOT_VERSION += 1
+    SNAPSHOT_TIME = time.time()
+    if BROADCASTER: BROADCASTER.publish()
+
+async def run_blocking(fn, *args):
+    """Runs a blocking file/system call in the dashboard's own executor."""
+    return await asyncio.get_running_loop().run_in_executor(BLOCKING_EXECUTOR, fn, *args)
+
+class StatsFileCache:
+    """Parsed p2pool data-api files keyed by file identity (inode, mtime, size).
+
+    A file is only re-parsed when its identity changes. If the parse fails
+    (e.g. a torn read of a file still being written) the last good parse is
+    kept and the identity is not recorded, so the next check retries. A file
+    that disappears (p2pool stopped, volume remounted) drops its entry and
+    reports an empty dict, so the section falls back to its defaults rather
+    than showing frozen numbers.
+    """
+
+    def __init__(self):
+        self.entries = {}   # path -> (identity, parsed json)
+        self.lock = threading.Lock()
+
+    def load(self, path):
+        """Returns (parsed, changed); parsed is None if the file never parsed."""
+        with self.lock:
+            cached = self.entries.get(path)
+            last_good = cached[1] if cached else None
+            try:
+                st = os.stat(path)
+            except OSError:
+                if cached is None: return None, False
+                del self.entries[path]
+                return {}, True
+            identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if cached and cached[0] == identity: return last_good, False
+            try:
+                with open(path, 'r') as f:
+                    parsed = json.load(f)
+            except (OSError, ValueError):
+                return last_good, False
+            self.entries[path] = (identity, parsed)
+            return parsed, True
+
+class StatsWatcher:
+    """Wakes file collectors as soon as p2pool rewrites a stats file.
+
+    Uses Linux inotify through ctypes on the stats directories; where that is
+    unavailable the collectors simply keep polling on their own interval.
+    """
+
+    IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x08, 0x80, 0x100
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, collectors):
+        self.collectors = collectors   # stats file path -> Collector
+        self.watches = {}              # watch descriptor -> directory
+        self.fd = None
+        try:
+            self.libc = ctypes.CDLL(None, use_errno=True)
+            self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if self.fd < 0: self.fd = None
+        except (OSError, AttributeError):
+            self.fd = None
+        if self.fd is None:
+            print("inotify unavailable, stats files will be polled", flush=True)
+
+    def add_watches(self):
+        """Watches stats directories not yet watched (p2pool may create them late)."""
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in {os.path.dirname(p) for p in self.collectors} - set(self.watches.values()):
+            wd = self.libc.inotify_add_watch(self.fd, directory.encode(), mask)
+            if wd >= 0: self.watches[wd] = directory
+
+    def on_readable(self):
+        try:
+            buf = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(buf):
+            wd, _, _, length = self.EVENT.unpack_from(buf, offset)
+            offset += self.EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            collector = self.collectors.get(os.path.join(self.watches.get(wd, ""), name))
+            if collector: collector.trigger()
+
+    async def run(self):
+        if self.fd is None: return
+        asyncio.get_running_loop().add_reader(self.fd, self.on_readable)
+        try:
+            while True:
+                self.add_watches()
+                await asyncio.sleep(60)
+        finally:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            os.close(self.fd)
+
+def read_hugepages():
+    with open("/proc/meminfo", "r") as f:
+        mem = f.read()
+    hp_total = int([l for l in mem.split('\n') if "HugePages_Total" in l][0].split()[1])
+    hp_free = int([l for l in mem.split('\n') if "HugePages_Free" in l][0].split()[1])
+    system = {"hp_val": f"{hp_total - hp_free} / {hp_total}", "hp_total": hp_total, "hp_free": hp_free}
+    if (hp_total - hp_free) > 500:
+        system["hp_status"], system["hp_class"] = "HEALTHY", "status-ok"
+    else:
+        system["hp_status"], system["hp_class"] = "NOT DETECTED", "status-bad"
+    return system
+
+def parse_p2p(p2p_json):
+    peers = p2p_json.get("peers", [])
+    return {
+        "pool_type": detect_pool_type(peers),
+        "connections": p2p_json.get("connections", 0),
+        "incoming": p2p_json.get("incoming_connections", 0),
+        "peers": p2p_json.get("peer_list_size", 0),
+        "uptime": format_uptime(p2p_json.get("uptime", 0)),
+        "zmq": p2p_json.get("zmq_last_active", 0)
+    }
+
+def parse_pool(pool_json):
+    stats = pool_json.get("pool_statistics", {})
+    return {
+        "hashrate": format_hr(stats.get("hashRate", 0)),
+        "hashrate_val": stats.get("hashRate", 0),
+        "miners": stats.get("miners", 0),
+        "blocks": stats.get("totalBlocksFound", 0),
+        "sidechain_height": f"{stats.get('sidechainHeight', 0):,}",
+        "total_hashes": format_big_num(stats.get("totalHashes", 0)),
+        "last_block_found": stats.get("lastBlockFound", 0),
+        "last_block_ts": stats.get("lastBlockFoundTime", 0),
+        "pplns_weight": format_big_num(stats.get("pplnsWeight", 0)),
+        "pplns_window": stats.get("pplnsWindowSize", 0),
+        "diff": format_big_num(stats.get("sidechainDifficulty", 0))
+    }
+
+def parse_network(net_json):
+    return {
+        "difficulty": f"{net_json.get('difficulty', 0):,}",
+        "height": f"{net_json.get('height', 0):,}",
+        "reward": f"{net_json.get('reward', 0) / 1e12:.4f}",
+        "hash": net_json.get('hash', 'N/A')[:12] + "...",
+        "ts": net_json.get('timestamp', 0)
+    }
+
+def parse_tari(t_json):
+    chains = t_json.get("chains", [])
+    if not chains: return None
+    t = chains[0]
+    return {
+        "status": t.get('channel_state', 'UNKNOWN'),
+        "address": t.get('wallet', 'Unknown'),
+        "height": t.get('height', 0),
+        "reward": t.get('reward', 0) / 1_000_000,
+        "diff": f"{t.get('difficulty', 0):,}"
+    }
+
+class Collector:
+    """One data source refreshed on its own interval.
+
+    fn returns a dict of snapshot sections which is published as soon as it
+    completes, so a slow source never holds back the others. An empty dict
+    means nothing changed. trigger() wakes the collector early.
+    """
+
+    def __init__(self, name, fn, interval, timeout, stage=0):
+        self.name, self.fn, self.interval, self.timeout, self.stage = name, fn, interval, timeout, stage
+        self.last_success = 0
+        self.last_error = None
+        self.wake = asyncio.Event()
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            updates = await asyncio.wait_for(self.fn(), self.timeout)
+            self.last_success, self.last_error = time.time(), None
+        except asyncio.TimeoutError:
+            updates, self.last_error = {}, "timeout"
+        except Exception as e:
+            updates, self.last_error = {}, str(e) or type(e).__name__
+        observe_stage(self.name, time.perf_counter() - started)
+        if updates: publish(updates)
+
+    async def run(self):
+        while True:
+            try: await asyncio.wait_for(self.wake.wait(), self.interval)
+            except asyncio.TimeoutError: pass
+            self.wake.clear()
+            await self.run_once()
+
+    def trigger(self):
+        self.wake.set()
+
+async def collect_system():
+    return {"system": await run_blocking(read_hugepages)}
+
+async def collect_disk():
+    return {"disk": await run_blocking(get_disk_usage, DISK_PATH)}
+
+def file_collector(path, key, parse):
+    async def collect():
+        raw, changed = await run_blocking(STATS_CACHE.load, path)
+        return {key: parse(raw)} if changed else {}
+    return collect
+
+class WorkerRecord:
+    """Raw per-worker values; display strings are only built for rows on screen."""
+
+    __slots__ = ("name", "host", "ip", "entry", "online", "uptime", "h10", "h60", "h15", "stratum_uptime", "stratum_h15", "latency")
+
+    def __init__(self, name, host=""):
+        self.name = name
+        self.host = host
+        self.ip = ""
+        self.entry = None
+        self.online = False
+        self.uptime = self.h10 = self.h60 = self.h15 = self.stratum_uptime = self.stratum_h15 = 0
+        self.latency = None
+
+    def state(self):
+        return (self.name, self.ip, self.online, self.uptime, self.h10, self.h60, self.h15, self.stratum_h15, self.latency)
+
+    def compact(self):
+        """Positional form shared with federation peers (see WorkerTable.replace)."""
+        return [self.name, self.ip, self.online, self.uptime, self.h10, self.h60, self.h15, self.stratum_h15, self.latency]
+
+    def row(self):
+        if self.online:
+            return {
+                "name": self.name, "host": self.host, "ip": self.ip, "status": "online", "up": format_uptime(self.uptime),
+                "h10": format_hr(self.h10), "h60": format_hr(self.h60), "h15": format_hr(self.h15),
+                "ping": f"{(self.latency or 0) * 1000:.0f} ms"
+            }
+        return {
+            "name": self.name, "host": self.host, "ip": self.ip, "status": "offline", "up": format_uptime(self.uptime),
+            "h10": "OFFLINE", "h60": "OFFLINE", "h15": format_hr(self.stratum_h15), "ping": "-"
         }
 
-        # 1. Huge Pages
+WORKER_SORT_KEYS = {
+    "name": lambda r: r.name,
+    "ip": lambda r: r.ip,
+    "status": lambda r: (not r.online, r.name),
+    "uptime": lambda r: r.uptime,
+    # Offline rows display the stratum-reported 15m rate, so sort on that too.
+    "hashrate": lambda r: r.h15 if r.online else r.stratum_h15,
+}
+
+class WorkerTable:
+    """Worker records keyed by stratum endpoint (host/endpoint in the fleet table), updated in place each cycle.
+
+    Sorted indexes (overall and per status) survive between cycles and are
+    re-sorted in place, which is close to linear when few values moved.
+    Filtered views are cached per version, so paging through a large farm
+    only slices the rows that are displayed.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.version = 0
+        self.indexes = {key: [] for key in WORKER_SORT_KEYS}
+        self.by_status = {}
+        self.views = {}
+        self.summary = self.summarize()
+
+    def update(self, observations):
+        """Applies [(endpoint, name, stratum entry, live stats or None, probe latency)]; returns True if anything changed."""
+        seen, changed, members_changed = set(), False, False
+        for endpoint, name, entry, live, latency in observations:
+            seen.add(endpoint)
+            record = self.records.get(endpoint)
+            if record is None:
+                record = self.records[endpoint] = WorkerRecord(name)
+                members_changed = True
+            before = record.state()
+            if record.entry != entry:
+                parts = entry.split(',')
+                record.entry = entry
+                record.name = name
+                record.ip = endpoint
+                record.stratum_uptime = int(num(parts[1])) if len(parts) >= 2 else 0
+                record.stratum_h15 = num(parts[3]) if len(parts) >= 4 else 0
+            record.online = live is not None
+            if live:
+                record.uptime = live['uptime'] or 0
+                record.h10, record.h60, record.h15 = live['h10'] or 0, live['h60'] or 0, live['h15'] or 0
+                record.latency = latency
+            else:
+                record.uptime = record.stratum_uptime
+                record.h10 = record.h60 = record.h15 = 0
+                record.latency = None
+            changed |= record.state() != before
+        return self.finish(seen, changed, members_changed)
+
+    def replace(self, rows):
+        """Applies [(host, compact worker row)] from federation; returns True if anything changed."""
+        seen, changed, members_changed = set(), False, False
+        for host, (name, ip, online, uptime, h10, h60, h15, stratum_h15, latency) in rows:
+            key = f"{host}/{ip}"
+            seen.add(key)
+            record = self.records.get(key)
+            if record is None:
+                record = self.records[key] = WorkerRecord(name, host)
+                members_changed = True
+            before = record.state()
+            record.name, record.ip, record.online, record.uptime, record.latency = name, ip, bool(online), uptime, latency
+            record.h10, record.h60, record.h15, record.stratum_h15 = h10, h60, h15, stratum_h15
+            changed |= record.state() != before
+        return self.finish(seen, changed, members_changed)
+
+    def finish(self, seen, changed, members_changed):
+        """Drops records not seen this round and rebuilds indexes/summary if anything changed."""
+        for key in [k for k in self.records if k not in seen]:
+            del self.records[key]
+            members_changed = True
+        if not (changed or members_changed): return False
+
+        for key, index in self.indexes.items():
+            if members_changed: index[:] = self.records.values()
+            index.sort(key=WORKER_SORT_KEYS[key])
+        self.by_status = {
+            status: {key: [r for r in index if r.online == (status == "online")] for key, index in self.indexes.items()}
+            for status in ("online", "offline")
+        }
+        self.views = {}
+        self.version += 1
+        self.summary = self.summarize()
+        return True
+
+    def summarize(self):
+        rates = self.by_status.get("online", {}).get("hashrate", [])
+        def pct(p): return rates[min(len(rates) - 1, int(len(rates) * p / 100))].h15 if rates else 0
+        return {
+            "total": len(self.records),
+            "online": len(rates),
+            "offline": len(self.records) - len(rates),
+            "live_h15": sum(r.h15 for r in rates),
+            "total_h15": sum(r.h15 if r.online else r.stratum_h15 for r in self.records.values()),
+            "p10_h15": pct(10), "p50_h15": pct(50), "p90_h15": pct(90),
+            "min_h15": rates[0].h15 if rates else 0, "max_h15": rates[-1].h15 if rates else 0,
+        }
+
+    def page(self, sort="name", desc=False, status="", q="", page=1, per_page=WORKERS_PAGE_SIZE):
+        """One page of display rows plus paging info."""
+        sort = sort if sort in WORKER_SORT_KEYS else "name"
+        per_page = max(1, min(per_page, WORKERS_PAGE_MAX))
+        rows = self.by_status[status][sort] if status in self.by_status else self.indexes[sort]
+        q = q.strip().lower()
+        if q:
+            key = (sort, status, q)
+            if key not in self.views:
+                if len(self.views) >= 32: self.views.pop(next(iter(self.views)))
+                self.views[key] = [r for r in rows if q in r.name.lower() or q in r.ip or q in r.host.lower()]
+            rows = self.views[key]
+        total = len(rows)
+        pages = max(1, -(-total // per_page))
+        page = max(1, min(page, pages))
+        start = (page - 1) * per_page
+        if desc:
+            window = rows[max(0, total - start - per_page):total - start][::-1]
+        else:
+            window = rows[start:start + per_page]
+        return {
+            "version": self.version, "total": total, "page": page, "pages": pages, "per_page": per_page,
+            "sort": sort, "desc": desc, "status": status, "q": q, "rows": [r.row() for r in window]
+        }
+
+async def collect_workers():
+    entries = [e for e in LATEST_DATA.get("stratum", {}).get("workers", []) if isinstance(e, str)]
+    # p2pool lists one entry per stratum connection and names may repeat or be empty,
+    # so the connection's ip:port identifies a worker.
+    workers = [(parts[0], parts[4] if len(parts) >= 5 else "miner") for parts in (e.split(',', 5) for e in entries)]
+    results = await asyncio.gather(*(PROBER.probe(name, endpoint) for endpoint, name in workers))
+    PROBER.forget({endpoint for endpoint, _ in workers})
+
+    if not WORKERS.update([
+        (endpoint, name, e, live, PROBER.latency.get(endpoint)) for e, live, (endpoint, name) in zip(entries, results, workers)
+    ]):
+        return {}
+    return {"workers": WORKERS.summary, "workers_version": WORKERS.version, "total_live_h15": WORKERS.summary["total_h15"]}
+
+def compact_snapshot(d, rows=True):
+    """Raw totals (and worker rows) this dashboard exports to federation peers via /api/compact."""
+    compact = {
+        "host": d['host_ip'], "pool_type": d['p2p']['pool_type'],
+        "total_h15": d['total_live_h15'], "pool_h": d['pool']['hashrate_val'],
+        "stratum_h15": d['stratum'].get('hashrate_15m', 0), "workers": d['workers'],
+    }
+    if rows: compact["rows"] = [r.compact() for r in WORKERS.records.values()]
+    return compact
+
+class Federation:
+    """Fleet view merged from the compact snapshots of peer dashboards.
+
+    Peers are fetched concurrently over one keep-alive connector, each bounded
+    by FEDERATION_TIMEOUT, and revalidated with If-None-Match so an idle peer
+    answers 304. The last good snapshot is kept: a peer silent for longer than
+    FEDERATION_STALE is still listed, marked stale, but left out of the totals
+    and the fleet worker table.
+    """
+
+    def __init__(self, peers):
+        self.peers = {url: {"snapshot": None, "etag": None, "last_ok": 0, "error": None, "latency": None} for url in peers}
+        self.session = None
+        self.history = {}   # range name -> (monotonic time merged, chart points)
+
+    async def start(self):
+        connector = TCPConnector(limit=max(8, len(self.peers) * 2), ttl_dns_cache=300, keepalive_timeout=60)
+        self.session = ClientSession(connector=connector, timeout=ClientTimeout(total=FEDERATION_TIMEOUT))
+
+    async def close(self):
+        if self.session: await self.session.close()
+
+    async def fetch(self, url):
+        peer = self.peers[url]
+        headers = {"If-None-Match": peer["etag"]} if peer["etag"] else {}
+        started = time.monotonic()
         try:
-            with open("/proc/meminfo", "r") as f:
-                mem = f.read()
-            hp_total = int([l for l in mem.split('\n') if "HugePages_Total" in l][0].split()[1])
-            hp_free = int([l for l in mem.split('\n') if "HugePages_Free" in l][0].split()[1])
-            data["system"]["hp_val"] = f"{hp_total - hp_free} / {hp_total}"
-            if (hp_total - hp_free) > 500:
-                data["system"]["hp_status"], data["system"]["hp_class"] = "HEALTHY", "status-ok"
+            async with self.session.get(f"{url}/api/compact", headers=headers) as response:
+                if response.status == 200:
+                    peer["snapshot"], peer["etag"] = await response.json(), response.headers.get("ETag")
+                elif response.status != 304:
+                    raise RuntimeError(f"HTTP {response.status}")
+        except asyncio.TimeoutError:
+            peer["error"] = "timeout"
+            return
+        except Exception as e:
+            peer["error"] = str(e) or type(e).__name__
+            return
+        peer["last_ok"], peer["error"], peer["latency"] = time.time(), None, time.monotonic() - started
+
+    async def refresh(self):
+        await asyncio.gather(*(self.fetch(url) for url in self.peers))
+
+    def fresh(self, peer):
+        return peer["snapshot"] is not None and time.time() - peer["last_ok"] <= FEDERATION_STALE
+
+    def merge(self, local, local_rows):
+        """Returns (fleet summary, [(host, compact worker row)]) for this host plus every fresh peer."""
+        def entry(host, url, status, snap, note=""):
+            w = snap["workers"] if snap else {}
+            return {
+                "host": host, "url": url, "status": status, "note": note,
+                "pool_type": snap["pool_type"] if snap else "-", "h15": snap["total_h15"] if snap else 0,
+                "online": w.get("online", 0), "total": w.get("total", 0)
+            }
+
+        label = local["host"] if local["host"] != "Unknown Host" else "local"
+        hosts, used = [entry(label, "", "local", local)], {label}
+        rows = [(label, row) for row in local_rows]
+        for url, peer in self.peers.items():
+            snap = peer["snapshot"]
+            # Hosts are labelled by HOST_IP; fall back to the peer address when unset or ambiguous.
+            host = snap["host"] if snap and snap["host"] not in used and snap["host"] != "Unknown Host" else url.split("://")[-1]
+            used.add(host)
+            if snap is None:
+                hosts.append(entry(host, url, "down", None, peer["error"] or "waiting"))
+            elif not self.fresh(peer):
+                hosts.append(entry(host, url, "stale", snap, f"last seen {format_time_abs(peer['last_ok'])}"))
             else:
-                data["system"]["hp_status"], data["system"]["hp_class"] = "NOT DETECTED", "status-bad"
-        except: pass
+                hosts.append(entry(host, url, "ok", snap))
+                rows.extend((host, row) for row in snap.get("rows", []))
 
-        # 2. P2P Stats
-        if os.path.exists(P2P_STATS_PATH):
-            try:
-                with open(P2P_STATS_PATH, 'r') as f:
-                    p2p_json = json.load(f)
-                    peers = p2p_json.get("peers", [])
-                    data["p2p"] = {
-                        "pool_type": detect_pool_type(peers),
-                        "connections": p2p_json.get("connections", 0),
-                        "incoming": p2p_json.get("incoming_connections", 0),
-                        "peers": p2p_json.get("peer_list_size", 0),
-                        "uptime": format_uptime(p2p_json.get("uptime", 0)),
-                        "zmq": p2p_json.get("zmq_last_active", 0)
-                    }
-            except: pass
-
-        # 3. Pool Stats
-        if os.path.exists(POOL_STATS_PATH):
-            try:
-                with open(POOL_STATS_PATH, 'r') as f:
-                    pool_json = json.load(f)
-                    stats = pool_json.get("pool_statistics", {})
-                    data["pool"] = {
-                        "hashrate": format_hr(stats.get("hashRate", 0)),
-                        "miners": stats.get("miners", 0),
-                        "blocks": stats.get("totalBlocksFound", 0),
-                        "sidechain_height": f"{stats.get('sidechainHeight', 0):,}",
-                        "total_hashes": format_big_num(stats.get("totalHashes", 0)),
-                        "last_block_found": stats.get("lastBlockFound", 0),
-                        "last_block_ts": stats.get("lastBlockFoundTime", 0),
-                        "pplns_weight": format_big_num(stats.get("pplnsWeight", 0)),
-                        "pplns_window": stats.get("pplnsWindowSize", 0),
-                        "diff": format_big_num(stats.get("sidechainDifficulty", 0))
-                    }
-            except: pass
-
-        # 4. Network Stats
-        if os.path.exists(NETWORK_STATS_PATH):
-            try:
-                with open(NETWORK_STATS_PATH, 'r') as f:
-                    net_json = json.load(f)
-                    data["network"] = {
-                        "difficulty": f"{net_json.get('difficulty', 0):,}",
-                        "height": f"{net_json.get('height', 0):,}",
-                        "reward": f"{net_json.get('reward', 0) / 1e12:.4f}",
-                        "hash": net_json.get('hash', 'N/A')[:12] + "...",
-                        "ts": net_json.get('timestamp', 0)
-                    }
-            except: pass
-
-        # 5. Tari Stats
-        if os.path.exists(TARI_STATS_PATH):
-            try:
-                with open(TARI_STATS_PATH, 'r') as f:
-                    t_json = json.load(f)
-                    chains = t_json.get("chains", [])
-                    if chains:
-                        t = chains[0]
-                        data["tari"] = {
-                            "status": t.get('channel_state', 'UNKNOWN'),
-                            "address": t.get('wallet', 'Unknown'),
-                            "height": t.get('height', 0),
-                            "reward": t.get('reward', 0) / 1_000_000,
-                            "diff": f"{t.get('difficulty', 0):,}"
-                        }
-            except: pass
-
-        # 6. Stratum & Workers
-        if os.path.exists(STRATUM_STATS_PATH):
-            try:
-                with open(STRATUM_STATS_PATH, 'r') as f:
-                    s_json = json.load(f)
-                    data["stratum"] = s_json
-                    
-                    async with ClientSession() as session:
-                        tasks = []
-                        worker_meta = []
-                        for w_entry in s_json.get("workers", []):
-                            if isinstance(w_entry, str):
-                                parts = w_entry.split(',')
-                                ip_label, name = parts[0], (parts[4] if len(parts) >= 5 else "miner")
-                                worker_meta.append({'parts': parts, 'ip': ip_label, 'name': name})
-                                tasks.append(get_worker_live_stats(session, name, ip_label))
-                        
-                        results = await asyncio.gather(*tasks)
-
-                        for meta, live in zip(worker_meta, results):
-                            if live:
-                                w_data = {
-                                    "name": meta['name'], "ip": meta['ip'], "status": "online",
-                                    "up": format_uptime(live['uptime']),
-                                    "h10": format_hr(live['h10']), "h60": format_hr(live['h60']), "h15": format_hr(live['h15'])
-                                }
-                                data["total_live_h15"] += (live['h15'] or 0)
-                            else:
-                                raw_h15 = float(meta['parts'][3]) if len(meta['parts']) >= 4 else 0
-                                w_data = {
-                                    "name": meta['name'], "ip": meta['ip'], "status": "offline",
-                                    "up": format_uptime(meta['parts'][1]) if len(meta['parts']) >= 2 else "0",
-                                    "h10": "OFFLINE", "h60": "OFFLINE", "h15": format_hr(raw_h15)
-                                }
-                                data["total_live_h15"] += raw_h15
-                            data["workers"].append(w_data)
-            except: pass
-
-        HASHRATE_HISTORY.append({"t": time.strftime('%H:%M'), "v": data["total_live_h15"]})
-        if len(HASHRATE_HISTORY) > 30: HASHRATE_HISTORY.pop(0)
-        
-        LATEST_DATA = data
-        await asyncio.sleep(UPDATE_INTERVAL)
+        live = [h for h in hosts if h["status"] in ("local", "ok")]
+        fleet = {
+            "h15": sum(h["h15"] for h in live),
+            "online": sum(h["online"] for h in live),
+            "total": sum(h["total"] for h in live),
+            "hosts_ok": len(live), "hosts_total": len(hosts),
+            "pools": sorted({h["pool_type"] for h in live}),
+            "hosts": hosts,
+        }
+        return fleet, rows
 
-async def handle_get(request):
+    async def fetch_history(self, url, range_name):
+        try:
+            async with self.session.get(f"{url}/api/history", params={"series": "total", "range": range_name}) as response:
+                return await response.json() if response.status == 200 else None
+        except Exception: return None
+
+    async def fleet_history(self, range_name):
+        """Local and peer 'total' series summed per bucket, cached for FEDERATION_HISTORY_TTL."""
+        merged_at, points = self.history.get(range_name, (0, None))
+        if points and time.monotonic() - merged_at < FEDERATION_HISTORY_TTL: return points
+        seconds = history_range(range_name)
+        local, *peers = await asyncio.gather(
+            run_blocking(history_points, "total", seconds),
+            *(self.fetch_history(url, range_name) for url in self.peers)
+        )
+        sums = dict(zip(local["ts"], local["values"]))
+        for remote in peers:
+            # Every instance uses the same HISTORY_TIERS, so buckets line up unless retention differs.
+            if not remote or remote.get("step") != local["step"]: continue
+            for t, v in zip(remote["ts"], remote["values"]): sums[t] = sums.get(t, 0) + v
+        points = chart_points(local["step"], seconds, sorted(sums.items()))
+        self.history[range_name] = (time.monotonic(), points)
+        return points
+
+async def collect_federation():
+    await FEDERATION.refresh()
+    local_rows = [r.compact() for r in WORKERS.records.values()]
+    fleet, rows = FEDERATION.merge(compact_snapshot(LATEST_DATA, rows=False), local_rows)
+    updates = {}
+    if FLEET_WORKERS.replace(rows): updates["fleet_workers_version"] = FLEET_WORKERS.version
+    if fleet != LATEST_DATA.get("fleet"): updates["fleet"] = fleet
+    return updates
+
+async def collect_history():
     d = LATEST_DATA
-    if not d: return web.Response(text="Initializing data...", status=503)
+    # Per-worker series are keyed by name and IP (not port) so they survive stratum reconnects;
+    # connections sharing both are summed rather than overwritten.
+    series = {}
+    for r in WORKERS.records.values():
+        key = f"worker:{r.name}@{r.ip.split(':')[0]}"
+        series[key] = series.get(key, 0) + r.h15
+    series["total"] = d["total_live_h15"]
+    series["pool"] = d["pool"]["hashrate_val"]
+    series["stratum"] = d["stratum"].get("hashrate_15m", 0)
+    now = time.time()
+    await run_blocking(HISTORY.record, now, series)
+    BROADCASTER.send_history(now, "total", series["total"])
+    if "fleet" in d: BROADCASTER.send_history(now, "fleet", d["fleet"]["h15"])
+    return {}
+
+def build_collectors():
+    """Creates the collectors; stage orders the first pass (workers need stratum, federation and history need workers)."""
+    sources = {
+        "system": collect_system,
+        "disk": collect_disk,
+        "p2p": file_collector(STATS_FILES["p2p"], "p2p", parse_p2p),
+        "pool": file_collector(STATS_FILES["pool"], "pool", parse_pool),
+        "network": file_collector(STATS_FILES["network"], "network", parse_network),
+        "tari": file_collector(STATS_FILES["tari"], "tari", parse_tari),
+        "stratum": file_collector(STATS_FILES["stratum"], "stratum", lambda s_json: s_json),
+        "workers": collect_workers,
+        "history": collect_history,
+    }
+    if FEDERATION: sources["federation"] = collect_federation
+    stages = {"workers": 1, "federation": 2, "history": 3}
+    return {
+        name: Collector(name, fn, *COLLECTOR_SCHEDULE[name], stage=stages.get(name, 0))
+        for name, fn in sources.items()
+    }
+
+async def collect_once():
+    """Runs every collector once, stage by stage."""
+    for stage in sorted({c.stage for c in COLLECTORS.values()}):
+        await asyncio.gather(*(c.run_once() for c in COLLECTORS.values() if c.stage == stage))
+
+async def update_data_loop():
+    """Primes the snapshot, then lets each collector run on its own schedule."""
+    await collect_once()
+    watcher = StatsWatcher({path: COLLECTORS[name] for name, path in STATS_FILES.items()})
+    await asyncio.gather(watcher.run(), *(c.run() for c in COLLECTORS.values()))
+
+class Payload:
+    """A response body with precompressed variants and HTTP validators."""
+
+    def __init__(self, body, content_type, last_modified, cache_control):
+        self.body = body
+        self.content_type = content_type
+        self.gzip = gzip.compress(body, 6)
+        # Quality 5 is a few times faster than the default 11 and still beats gzip; bodies change every snapshot.
+        self.br = brotli.compress(body, quality=5) if brotli else None
+        self.etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self.mtime = int(last_modified)
+        self.last_modified = formatdate(last_modified, usegmt=True)
+        self.cache_control = cache_control
+
+def accepted_encodings(header):
+    """Content codings from an Accept-Encoding header whose q-value is above zero."""
+    weights = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try: q = float(value)
+                except ValueError: q = 0.0
+        if coding: weights[coding.lower()] = q
+    wildcard = weights.pop("*", 0)
+    return {c for c in ("br", "gzip") if weights.get(c, wildcard) > 0}
+
+def not_modified(request, payload):
+    """If-None-Match wins when present (RFC 9110); otherwise fall back to If-Modified-Since."""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or payload.etag in if_none_match
+    since = request.if_modified_since
+    return since is not None and since.timestamp() >= payload.mtime
+
+def serve_payload(request, payload):
+    headers = {
+        "ETag": payload.etag, "Last-Modified": payload.last_modified,
+        "Cache-Control": payload.cache_control, "Vary": "Accept-Encoding"
+    }
+    if not_modified(request, payload):
+        return web.Response(status=304, headers=headers)
+    accept = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+    body = payload.body
+    if payload.br and "br" in accept:
+        body, headers["Content-Encoding"] = payload.br, "br"
+    elif "gzip" in accept:
+        body, headers["Content-Encoding"] = payload.gzip, "gzip"
+    return web.Response(body=body, headers=headers, content_type=payload.content_type, charset="utf-8")
+
+class RenderCache:
+    """Renders each page/API body at most once per snapshot version."""
 
-    rows = "".join([f"""
+    def __init__(self):
+        self.entries = {}   # key -> (snapshot version, Payload)
+
+    def get(self, key, content_type, render):
+        version, payload = self.entries.get(key, (None, None))
+        if version != SNAPSHOT_VERSION:
+            started = time.perf_counter()
+            payload = Payload(render().encode(), content_type, SNAPSHOT_TIME, "no-cache")
+            observe_stage(f"render_{key}", time.perf_counter() - started)
+            self.entries[key] = (SNAPSHOT_VERSION, payload)
+        return payload
+
+class StaticAssets:
+    """Files under STATIC_DIR, loaded once and served with long-lived cache headers."""
+
+    def __init__(self, directory):
+        self.files = {}
+        if not os.path.isdir(directory): return
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path): continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            self.files[name] = Payload(body, content_type, os.path.getmtime(path), "public, max-age=31536000, immutable")
+
+    def url(self, name, fallback=None):
+        """Cache-busting URL for an asset, or fallback if it is not bundled."""
+        payload = self.files.get(name)
+        return f"/static/{name}?v={payload.etag.strip(chr(34))}" if payload else fallback
+
+def build_view(d):
+    """Display strings for every live field on the page, shared by the HTML render and /api/snapshot."""
+    s, p, n, t, w = d['stratum'], d['pool'], d['network'], d['tari'], d['workers']
+    fields = {
+        "host_ip": d['host_ip'],
+        "pool_type": f"P2Pool {d['p2p']['pool_type']}",
+        "hugepages": f"Huge Pages: {d['system']['hp_status']} ({d['system']['hp_val']})",
+        "disk": f"Disk: {d['disk']['used']} / {d['disk']['total']} ({d['disk']['percent']})",
+        "total_hr": format_hr(d['total_live_h15']),
+        "now": f"Last Update: {d['now']}",
+        "stratum_hr": f"{format_hr(s.get('hashrate_15m'))} / {format_hr(s.get('hashrate_1h'))} / {format_hr(s.get('hashrate_24h'))}",
+        "shares": f"{s.get('shares_found', 0)} / {s.get('shares_failed', 0)}",
+        "effort": f"{s.get('current_effort', 0):.2f}% / {s.get('average_effort', 0):.2f}%",
+        "total_shares": format_big_num(s.get('total_stratum_shares', 0)),
+        "reward_share": f"{s.get('block_reward_share_percent', 0):.3f}%",
+        "stratum_conns": f"In: {s.get('incoming_connections', 0)} / Out: {s.get('connections', 0)}",
+        "last_share": format_time_abs(s.get('last_share_found_time', 0)),
+        "stratum_hashes": format_big_num(s.get('total_hashes', 0)),
+        "wallet": f"Wallet: {s.get('wallet', 'N/A')}",
+        "sidechain_height": p['sidechain_height'],
+        "pool_diff": p['diff'],
+        "pool_hr": p['hashrate'],
+        "pool_hashes": p['total_hashes'],
+        "miners": p['miners'],
+        "pplns": f"{p['pplns_window']} / {p['pplns_weight']}",
+        "blocks": p['blocks'],
+        "last_block": f"{p['last_block_found']} ({format_time_abs(p['last_block_ts'])})",
+        "peers": f"{d['p2p']['connections']} / {d['p2p']['incoming']} / {d['p2p']['peers']}",
+        "p2p_status": f"Up: {d['p2p']['uptime']} (ZMQ: {d['p2p']['zmq']}s)",
+        "net_height": n['height'],
+        "net_reward": f"{n['reward']} XMR",
+        "net_diff": n['difficulty'],
+        "net_hash": n['hash'],
+        "net_time": format_time_abs(n['ts']),
+        "tari_status": t['status'] if t else "Waiting for data...",
+        "tari_reward": f"{t['reward']:.2f} TARI" if t else "-",
+        "tari_height": t['height'] if t else "-",
+        "tari_diff": t['diff'] if t else "-",
+        "tari_wallet": f"Wallet: {t['address']}" if t else "",
+        "workers_alive": f"Workers Alive: {w['online']} / {w['total']}",
+        "workers_stats": f"Offline: {w['offline']} | Median: {format_hr(w['p50_h15'])} | P10: {format_hr(w['p10_h15'])} | P90: {format_hr(w['p90_h15'])}",
+    }
+    view = {
+        "version": SNAPSHOT_VERSION, "fields": fields, "workers_version": d['workers_version'],
+        "hp_class": d['system']['hp_class'], "disk_pct": round(d['disk']['percent_val'], 1)
+    }
+    if FEDERATION:
+        f = d.get('fleet') or {"h15": 0, "online": 0, "total": 0, "hosts_ok": 0, "hosts_total": 0, "pools": [], "hosts": []}
+        fields["fleet_hr"] = format_hr(f['h15'])
+        fields["fleet_hosts"] = f"{f['hosts_ok']} / {f['hosts_total']}"
+        fields["fleet_workers"] = f"{f['online']} / {f['total']}"
+        fields["fleet_pools"] = ", ".join(f['pools']) or "-"
+        view["fleet_workers_version"] = d['fleet_workers_version']
+        view["hosts"] = [{
+            "host": h['host'], "status": h['status'], "pool": h['pool_type'], "hr": format_hr(h['h15']),
+            "workers": f"{h['online']} / {h['total']}", "note": h['note']
+        } for h in f['hosts']]
+    return view
+
+def render_worker_rows(workers, hosts=False):
+    e = html.escape
+    return "".join([f"""
         <tr>
-            <td><span class="dot {w['status']}"></span>{w['name']}</td>
-            <td>{w['ip']}</td>
-            <td>{w['up']}</td>
-            <td>{w['h10']}</td>
-            <td>{w['h60']}</td>
-            <td class="bold">{w['h15']}</td>
-        </tr>""" for w in d["workers"]])
-
-    tari_section = f"""
-        <div class="card">
-            <h3>Tari Merge Mining</h3>
-            <div class="stat-grid">
-                <div class="stat-card"><h5>Status</h5><p>{d['tari']['status']}</p></div>
-                <div class="stat-card"><h5>Reward</h5><p>{d['tari']['reward']:.2f} TARI</p></div>
-                <div class="stat-card"><h5>Height</h5><p>{d['tari']['height']}</p></div>
-                <div class="stat-card"><h5>Difficulty</h5><p>{d['tari']['diff']}</p></div>
+            <td><span class="dot {e(w['status'])}"></span>{e(w['name'])}</td>{f"<td>{e(w['host'])}</td>" if hosts else ""}
+            <td>{e(w['ip'])}</td>
+            <td>{e(w['up'])}</td>
+            <td>{e(w['h10'])}</td>
+            <td>{e(w['h60'])}</td>
+            <td class="bold">{e(w['h15'])}</td>
+            <td>{e(w['ping'])}</td>
+        </tr>""" for w in workers])
+
+def render_host_rows(hosts):
+    e = html.escape
+    return "".join([f"""
+        <tr>
+            <td><span class="dot {e(h['status'])}"></span>{e(h['host'])}</td>
+            <td>{e(h['pool'])}</td>
+            <td class="bold">{e(h['hr'])}</td>
+            <td>{e(h['workers'])}</td>
+            <td>{e(h['status'])} <small>{e(h['note'])}</small></td>
+        </tr>""" for h in hosts])
+
+def render_fleet(view, v):
+    if "hosts" not in view: return ""
+    return f"""
+        <div class="card fleet">
+            <h3>Fleet</h3>
+            <div class="stat-grid fleet-grid">
+                <div class="stat-card"><h5>Fleet Hashrate (15m)</h5><p>{v['fleet_hr']}</p></div>
+                <div class="stat-card"><h5>Hosts Up</h5><p>{v['fleet_hosts']}</p></div>
+                <div class="stat-card"><h5>Workers Alive</h5><p>{v['fleet_workers']}</p></div>
+                <div class="stat-card"><h5>Pools</h5><p>{v['fleet_pools']}</p></div>
             </div>
-            <div style="font-size:10px; color:#666; margin-top:10px; overflow-wrap: break-word;">Wallet: {d['tari']['address']}</div>
-        </div>""" if d['tari'] else '<div class="card"><h3>Tari</h3><p>Waiting for data...</p></div>'
-
-    html = f"""
-    <!DOCTYPE html><html><head><title>Mining Dashboard</title><meta http-equiv="refresh" content="30">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        :root {{ --bg: #0d1117; --card: #161b22; --border: #30363d; --text: #c9d1d9; --accent: #58a6ff; --ok: #238636; --bad: #da3633; --warn: #d29922; }}
-        body {{ font-family: -apple-system, sans-serif; background: var(--bg); color: var(--text); padding: 20px; }}
-        .container {{ max-width: 1200px; margin: auto; }}
-        .header {{ display: flex; justify-content: space-between; border-bottom: 1px solid var(--border); padding-bottom: 10px; margin-bottom: 20px; }}
-        .grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); gap: 20px; margin-bottom: 20px; }}
-        .card {{ background: var(--card); border: 1px solid var(--border); border-radius: 6px; padding: 15px; }}
-        h3 {{ margin: 0 0 15px 0; font-size: 14px; text-transform: uppercase; color: #8b949e; }}
-        .stat-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 10px; }}
-        .stat-card {{ background: #0d1117; padding: 10px; border-radius: 4px; border: 1px solid var(--border); }}
-        .stat-card h5 {{ margin: 0; font-size: 10px; color: #8b949e; }}
-        .stat-card p {{ margin: 5px 0 0 0; font-weight: bold; font-size: 16px; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th {{ text-align: left; font-size: 12px; color: #8b949e; padding: 10px; border-bottom: 1px solid var(--border); }}
-        td {{ padding: 10px; border-bottom: 1px solid #21262d; font-size: 13px; }}
-        .dot {{ height: 8px; width: 8px; border-radius: 50%; display: inline-block; margin-right: 8px; }}
-        .online {{ background: var(--ok); box-shadow: 0 0 5px var(--ok); }} .offline {{ background: var(--bad); }}
-        .status-ok {{ color: var(--ok); }} .status-bad {{ color: var(--bad); }} .status-warn {{ color: var(--warn); }}
-        .bold {{ font-weight: bold; color: var(--accent); }}
-        .progress-bg {{ background: var(--border); border-radius: 4px; height: 10px; width: 100%; margin-top: 5px; }}
-        .progress-fill {{ background: var(--accent); height: 100%; border-radius: 4px; transition: width 0.5s; }}
-        .progress-fill.warning {{ background: var(--warn); }} .progress-fill.critical {{ background: var(--bad); }}
-        .pool-badge {{ background: var(--accent); color: #000; padding: 2px 6px; border-radius: 4px; font-size: 12px; vertical-align: middle; margin-left: 10px; font-weight: bold; }}
-    </style></head>
-    <body><div class="container">
+            <table><thead><tr><th>Host</th><th>Pool</th><th>Hashrate</th><th>Workers</th><th>Status</th></tr></thead><tbody id="fleet-hosts">{render_host_rows(view['hosts'])}</tbody></table>
+        </div>"""
+
+def render_page(view):
+    fleet = "hosts" in view
+    workers_page = (FLEET_WORKERS if fleet else WORKERS).page()
+    v = {key: f'<span data-k="{key}">{html.escape(str(val))}</span>' for key, val in view["fields"].items()}
+    disk_pct = view["disk_pct"]
+    range_links = " ".join(f'<a href="?range={r}" style="color: var(--accent); margin-left: 8px;">{r}</a>' for r in HISTORY_RANGES)
+
+    return f"""
+    <!DOCTYPE html><html><head><title>Mining Dashboard</title>
+    <noscript><meta http-equiv="refresh" content="30"></noscript>
+    <link rel="stylesheet" href="{ASSETS.url('dashboard.css')}">
+    <script src="{ASSETS.url('chart.umd.min.js', CHART_JS_CDN)}"></script>
+    </head>
+    <body data-series="{'fleet' if fleet else 'total'}"><div class="container">
         <div class="header">
             <div>
                 <div style="display:flex; align-items:center;">
-                    <h2 style="margin:0">{d['host_ip']}</h2>
-                    <span class="pool-badge">P2Pool {d['p2p']['pool_type']}</span>
+                    <h2 style="margin:0">{v['host_ip']}</h2>
+                    <span class="pool-badge">{v['pool_type']}</span>
                 </div>
-                <span class="{d['system']['hp_class']}">Huge Pages: {d['system']['hp_status']} ({d['system']['hp_val']})</span>
+                <span id="hugepages" class="{view['hp_class']}">{v['hugepages']}</span>
                 <div style="margin-top: 5px; font-size: 12px; color: #8b949e;">
-                    Disk: {d['disk']['used']} / {d['disk']['total']} ({d['disk']['percent']})
-                    <div class="progress-bg"><div class="progress-fill {'critical' if d['disk']['percent_val'] > 90 else 'warning' if d['disk']['percent_val'] > 75 else ''}" style="width: {d['disk']['percent']}"></div></div>
+                    {v['disk']}
+                    <div class="progress-bg"><div id="disk-fill" class="progress-fill {'critical' if disk_pct > 90 else 'warning' if disk_pct > 75 else ''}" style="width: {disk_pct}%"></div></div>
                 </div>
             </div>
             <div style="text-align: right">
-                <div style="font-size: 18px; font-weight: bold;">{format_hr(d['total_live_h15'])}</div>
-                <small style="color:#8b949e">Last Update: {d['now']}</small>
+                <div style="font-size: 18px; font-weight: bold;">{v['total_hr']}</div>
+                <small style="color:#8b949e">{v['now']}</small>
             </div>
-        </div>
+        </div>{render_fleet(view, v)}
         <div class="grid">
-            <div class="card"><canvas id="hChart" height="180"></canvas></div>
+            <div class="card">
+                <div style="text-align: right; font-size: 11px; margin-bottom: 5px;">{range_links}</div>
+                <canvas id="hChart" height="180"></canvas>
+            </div>
             
             <div class="card">
                 <h3>Stratum Pool</h3>
                 <div class="stat-grid">
                     <div class="stat-card" style="grid-column: span 2;">
                         <h5>Hashrate (15m / 1h / 24h)</h5>
-                        <p style="font-size: 11px; line-height: 1.4;">
-                            {format_hr(d['stratum'].get('hashrate_15m'))} / 
-                            {format_hr(d['stratum'].get('hashrate_1h'))} / 
-                            {format_hr(d['stratum'].get('hashrate_24h'))}
-                        </p>
+                        <p style="font-size: 11px; line-height: 1.4;">{v['stratum_hr']}</p>
                     </div>
-                    <div class="stat-card"><h5>Shares (OK/Err)</h5><p>{d['stratum'].get('shares_found', 0)} / {d['stratum'].get('shares_failed',0)}</p></div>
-                    <div class="stat-card"><h5>Effort (Curr/Avg)</h5><p>{d['stratum'].get('current_effort',0):.2f}% / {d['stratum'].get('average_effort',0):.2f}%</p></div>
-                    <div class="stat-card"><h5>Total Shares</h5><p>{format_big_num(d['stratum'].get('total_stratum_shares',0))}</p></div>
-                    <div class="stat-card"><h5>Reward Share</h5><p>{d['stratum'].get('block_reward_share_percent',0):.3f}%</p></div>
-                    <div class="stat-card"><h5>Connections</h5><p>In: {d['stratum'].get('incoming_connections',0)} / Out: {d['stratum'].get('connections',0)}</p></div>
-                    <div class="stat-card"><h5>Last Share</h5><p>{format_time_abs(d['stratum'].get('last_share_found_time', 0))}</p></div>
-                    <div class="stat-card" style="grid-column: span 2;"><h5>Total Hashes</h5><p>{format_big_num(d['stratum'].get('total_hashes',0))}</p></div>
+                    <div class="stat-card"><h5>Shares (OK/Err)</h5><p>{v['shares']}</p></div>
+                    <div class="stat-card"><h5>Effort (Curr/Avg)</h5><p>{v['effort']}</p></div>
+                    <div class="stat-card"><h5>Total Shares</h5><p>{v['total_shares']}</p></div>
+                    <div class="stat-card"><h5>Reward Share</h5><p>{v['reward_share']}</p></div>
+                    <div class="stat-card"><h5>Connections</h5><p>{v['stratum_conns']}</p></div>
+                    <div class="stat-card"><h5>Last Share</h5><p>{v['last_share']}</p></div>
+                    <div class="stat-card" style="grid-column: span 2;"><h5>Total Hashes</h5><p>{v['stratum_hashes']}</p></div>
                 </div>
-                <div style="font-size:10px; color:#666; margin-top:10px; overflow-wrap: break-word;">Wallet: {d['stratum'].get('wallet', 'N/A')}</div>
+                <div style="font-size:10px; color:#666; margin-top:10px; overflow-wrap: break-word;">{v['wallet']}</div>
             </div>
 
             <div class="card">
                 <h3>P2Pool Network</h3>
                 <div class="stat-grid">
-                    <div class="stat-card"><h5>Sidechain Height</h5><p>{d['pool']['sidechain_height']}</p></div>
-                    <div class="stat-card"><h5>Difficulty</h5><p>{d['pool']['diff']}</p></div>
-                    <div class="stat-card"><h5>Pool Hashrate</h5><p>{d['pool']['hashrate']}</p></div>
-                    <div class="stat-card"><h5>Total Hashes</h5><p>{d['pool']['total_hashes']}</p></div>
-                    <div class="stat-card"><h5>Miners</h5><p>{d['pool']['miners']}</p></div>
-                    <div class="stat-card"><h5>PPLNS (Win/Wt)</h5><p>{d['pool']['pplns_window']} / {d['pool']['pplns_weight']}</p></div>
-                    <div class="stat-card"><h5>Blocks Found</h5><p>{d['pool']['blocks']}</p></div>
-                    <div class="stat-card"><h5>Last Block</h5><p>{d['pool']['last_block_found']} ({format_time_abs(d['pool']['last_block_ts'])})</p></div>
-                    <div class="stat-card"><h5>Peers (Out/In/All)</h5><p>{d['p2p']['connections']} / {d['p2p']['incoming']} / {d['p2p']['peers']}</p></div>
-                    <div class="stat-card"><h5>Status</h5><p>Up: {d['p2p']['uptime']} (ZMQ: {d['p2p']['zmq']}s)</p></div>
+                    <div class="stat-card"><h5>Sidechain Height</h5><p>{v['sidechain_height']}</p></div>
+                    <div class="stat-card"><h5>Difficulty</h5><p>{v['pool_diff']}</p></div>
+                    <div class="stat-card"><h5>Pool Hashrate</h5><p>{v['pool_hr']}</p></div>
+                    <div class="stat-card"><h5>Total Hashes</h5><p>{v['pool_hashes']}</p></div>
+                    <div class="stat-card"><h5>Miners</h5><p>{v['miners']}</p></div>
+                    <div class="stat-card"><h5>PPLNS (Win/Wt)</h5><p>{v['pplns']}</p></div>
+                    <div class="stat-card"><h5>Blocks Found</h5><p>{v['blocks']}</p></div>
+                    <div class="stat-card"><h5>Last Block</h5><p>{v['last_block']}</p></div>
+                    <div class="stat-card"><h5>Peers (Out/In/All)</h5><p>{v['peers']}</p></div>
+                    <div class="stat-card"><h5>Status</h5><p>{v['p2p_status']}</p></div>
                 </div>
             </div>
 
             <div class="card">
                 <h3>XMR Network</h3>
                 <div class="stat-grid">
-                    <div class="stat-card"><h5>Block Height</h5><p>{d['network']['height']}</p></div>
-                    <div class="stat-card"><h5>Reward</h5><p>{d['network']['reward']} XMR</p></div>
-                    <div class="stat-card" style="grid-column: span 2;"><h5>Difficulty</h5><p>{d['network']['difficulty']}</p></div>
+                    <div class="stat-card"><h5>Block Height</h5><p>{v['net_height']}</p></div>
+                    <div class="stat-card"><h5>Reward</h5><p>{v['net_reward']}</p></div>
+                    <div class="stat-card" style="grid-column: span 2;"><h5>Difficulty</h5><p>{v['net_diff']}</p></div>
                     <div class="stat-card" style="grid-column: span 2;">
                         <h5>Current Block Hash</h5>
-                        <p style="font-size:10px; font-family:monospace;">{d['network']['hash']}</p>
+                        <p style="font-size:10px; font-family:monospace;">{v['net_hash']}</p>
                     </div>
-                    <div class="stat-card" style="grid-column: span 2;"><h5>Network Time</h5><p>{format_time_abs(d['network']['ts'])}</p></div>
+                    <div class="stat-card" style="grid-column: span 2;"><h5>Network Time</h5><p>{v['net_time']}</p></div>
                 </div>
             </div>
-            
-            {tari_section}
+
+            <div class="card">
+                <h3>Tari Merge Mining</h3>
+                <div class="stat-grid">
+                    <div class="stat-card"><h5>Status</h5><p>{v['tari_status']}</p></div>
+                    <div class="stat-card"><h5>Reward</h5><p>{v['tari_reward']}</p></div>
+                    <div class="stat-card"><h5>Height</h5><p>{v['tari_height']}</p></div>
+                    <div class="stat-card"><h5>Difficulty</h5><p>{v['tari_diff']}</p></div>
+                </div>
+                <div style="font-size:10px; color:#666; margin-top:10px; overflow-wrap: break-word;">{v['tari_wallet']}</div>
+            </div>
         </div>
         <div class="card">
-            <h3>Workers Alive: {len(d['workers'])}</h3>
-            <table><thead><tr><th>Worker</th><th>IP</th><th>Uptime</th><th>10s</th><th>60s</th><th>15m</th></tr></thead><tbody>{rows}</tbody></table>
+            <div class="worker-head">
+                <h3>{v['workers_alive']}</h3>
+                <div>
+                    {'<select id="worker-scope"><option value="fleet">Fleet</option><option value="local">This host</option></select>' if fleet else ''}
+                    <input id="worker-q" type="search" placeholder="Filter name / IP{' / host' if fleet else ''}">
+                    <select id="worker-status"><option value="">All</option><option value="online">Online</option><option value="offline">Offline</option></select>
+                </div>
+            </div>
+            <div style="font-size: 12px; color: #8b949e; margin-bottom: 10px;">{v['workers_stats']}</div>
+            <table><thead><tr><th data-sort="name">Worker</th>{'<th>Host</th>' if fleet else ''}<th data-sort="ip">IP</th><th data-sort="uptime">Uptime</th><th>10s</th><th>60s</th><th data-sort="hashrate">15m</th><th>Ping</th></tr></thead><tbody id="workers" data-version="{workers_page['version']}">{render_worker_rows(workers_page['rows'], fleet)}</tbody></table>
+            <div class="pager"><button id="worker-prev">&lsaquo;</button><span id="worker-page">Page {workers_page['page']} / {workers_page['pages']} ({workers_page['total']})</span><button id="worker-next">&rsaquo;</button></div>
         </div>
     </div>
-    <script>
-        new Chart(document.getElementById('hChart'), {{
-            type: 'line',
-            data: {{
-                labels: {[x['t'] for x in HASHRATE_HISTORY]},
-                datasets: [{{ label: 'H/s', data: {[x['v'] for x in HASHRATE_HISTORY]}, borderColor: '#58a6ff', tension: 0.3, fill: true, backgroundColor: 'rgba(88,166,255,0.1)' }}]
-            }},
-            options: {{ responsive: true, maintainAspectRatio: false, plugins: {{ legend: {{ display: false }} }}, scales: {{ y: {{ grid: {{ color: '#30363d' }} }}, x: {{ display: false }} }} }}
-        }});
-    </script></body></html>
+    <script src="{ASSETS.url('dashboard.js')}"></script>
+    </body></html>
     """
-    return web.Response(text=html, content_type='text/html')
+
+class Broadcaster:
+    """Pushes snapshot deltas to Server-Sent Events subscribers.
+
+    Each publish is diffed against the last view sent (changed fields and the
+    worker table version) and encoded once for every client. Clients get a
+    bounded queue; one that falls SSE_QUEUE_SIZE messages behind is dropped
+    by aborting its connection (its handler may be stuck draining a write),
+    and its EventSource reconnects to a fresh full snapshot.
+    """
+
+    def __init__(self):
+        self.clients = {}   # queue -> transport of the subscribed request
+        self.last_view = None
+
+    def subscribe(self, transport):
+        queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.clients[queue] = transport
+        return queue
+
+    def unsubscribe(self, queue):
+        self.clients.pop(queue, None)
+
+    def drop(self, queue):
+        transport = self.clients.pop(queue, None)
+        if transport: transport.abort()
+
+    def send(self, message):
+        data = f"event: delta\ndata: {json.dumps(message)}\n\n".encode()
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Slow consumer: discard its backlog, wake the handler and cut the connection.
+                while not queue.empty(): queue.get_nowait()
+                queue.put_nowait(None)
+                self.drop(queue)
+
+    def publish(self):
+        if not self.clients:
+            self.last_view = None
+            return
+        view = build_view(LATEST_DATA)
+        old = self.last_view or {"fields": {}}
+        self.last_view = view
+        delta = {"version": view["version"]}
+        fields = {k: val for k, val in view["fields"].items() if old["fields"].get(k) != val}
+        if fields: delta["fields"] = fields
+        for key in ("hp_class", "disk_pct", "workers_version", "fleet_workers_version", "hosts"):
+            if key in view and old.get(key) != view[key]: delta[key] = view[key]
+        if len(delta) > 1: self.send(delta)
+
+    def send_history(self, ts, series, value):
+        step = HISTORY_TIERS[0][0]
+        bucket = int(ts) - int(ts) % step
+        label = time.strftime('%H:%M', time.localtime(bucket))
+        self.send({"history": {"series": series, "step": step, "ts": bucket, "label": label, "v": round(value, 2)}})
+
+class Histogram:
+    """Cumulative Prometheus histogram over METRIC_BUCKETS."""
+
+    def __init__(self):
+        self.counts = [0] * len(METRIC_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(METRIC_BUCKETS):
+            if value <= bound: self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+def observe_stage(stage, seconds):
+    STAGE_TIMINGS.setdefault(stage, Histogram()).observe(seconds)
+
+def metric_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def num(value):
+    try: return float(value or 0)
+    except (TypeError, ValueError): return 0.0
+
+def render_metrics():
+    """Prometheus text exposition built from raw values, never from the rendered page."""
+    d = LATEST_DATA or default_snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{metric_label(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+    def raw(source):
+        entry = STATS_CACHE.entries.get(STATS_FILES[source]) if STATS_CACHE else None
+        return entry[1] if entry else {}
+
+    pool = raw("pool").get("pool_statistics", {})
+    for key, name in [("hashRate", "hashrate"), ("miners", "miners"), ("totalBlocksFound", "blocks_found"),
+                      ("sidechainHeight", "sidechain_height"), ("sidechainDifficulty", "sidechain_difficulty"),
+                      ("totalHashes", "total_hashes"), ("pplnsWindowSize", "pplns_window"), ("pplnsWeight", "pplns_weight")]:
+        metric(f"p2pool_pool_{name}", "gauge", f"p2pool pool_statistics.{key}", [({}, num(pool.get(key)))])
+
+    stratum = raw("stratum")
+    for key in ("hashrate_15m", "hashrate_1h", "hashrate_24h", "total_hashes", "shares_found", "shares_failed",
+                "current_effort", "average_effort", "connections", "incoming_connections", "block_reward_share_percent"):
+        metric(f"p2pool_stratum_{key}", "gauge", f"p2pool local stratum {key}", [({}, num(stratum.get(key)))])
+
+    p2p = raw("p2p")
+    for key in ("connections", "incoming_connections", "peer_list_size", "uptime", "zmq_last_active"):
+        metric(f"p2pool_p2p_{key}", "gauge", f"p2pool local p2p {key}", [({}, num(p2p.get(key)))])
+
+    network = raw("network")
+    metric("monero_network_difficulty", "gauge", "Monero network difficulty", [({}, num(network.get("difficulty")))])
+    metric("monero_network_height", "gauge", "Monero block height", [({}, num(network.get("height")))])
+    metric("monero_network_reward_xmr", "gauge", "Monero block reward in XMR", [({}, num(network.get("reward")) / 1e12)])
+    metric("monero_network_timestamp_seconds", "gauge", "Timestamp of the latest Monero block", [({}, num(network.get("timestamp")))])
+
+    chains = raw("tari").get("chains", [])
+    tari = chains[0] if chains else {}
+    metric("tari_height", "gauge", "Tari merge-mined chain height", [({}, num(tari.get("height")))])
+    metric("tari_reward", "gauge", "Tari block reward in TARI", [({}, num(tari.get("reward")) / 1_000_000)])
+    metric("tari_difficulty", "gauge", "Tari difficulty", [({}, num(tari.get("difficulty")))])
+
+    metric("dashboard_hugepages_total", "gauge", "HugePages_Total from /proc/meminfo", [({}, d["system"]["hp_total"])])
+    metric("dashboard_hugepages_free", "gauge", "HugePages_Free from /proc/meminfo", [({}, d["system"]["hp_free"])])
+    metric("dashboard_disk_total_bytes", "gauge", f"Size of {DISK_PATH}", [({}, d["disk"]["total_bytes"])])
+    metric("dashboard_disk_used_bytes", "gauge", f"Used bytes on {DISK_PATH}", [({}, d["disk"]["used_bytes"])])
+
+    workers = list(WORKERS.records.values()) if WORKERS else []
+    metric("dashboard_total_hashrate", "gauge", "Sum of worker 15m hashrates (H/s)", [({}, d["total_live_h15"])])
+    metric("dashboard_workers", "gauge", "Workers reported by stratum by probe status", [
+        ({"status": "online"}, d["workers"]["online"]), ({"status": "offline"}, d["workers"]["offline"])
+    ])
+    def worker(r): return {"worker": r.name, "endpoint": r.ip}
+    metric("xmrig_worker_up", "gauge", "1 if the worker's XMRig API answered", [(worker(r), int(r.online)) for r in workers])
+    for window in ("h10", "h60", "h15"):
+        metric(f"xmrig_worker_hashrate_{window}", "gauge", f"XMRig {window} hashrate (H/s)", [(worker(r), num(getattr(r, window))) for r in workers])
+    if PROBER:
+        metric("xmrig_probe_latency_seconds", "gauge", "Duration of the last successful XMRig API probe", [
+            (worker(r), round(PROBER.latency[r.ip], 6)) for r in workers if r.ip in PROBER.latency
+        ])
+        metric("xmrig_probes_total", "counter", "XMRig API probes by outcome", [
+            ({**worker(r), "outcome": outcome}, count) for r in workers for outcome, count in PROBER.outcomes.get(r.ip, {}).items()
+        ])
+
+    if FEDERATION:
+        metric("dashboard_fleet_hashrate", "gauge", "Sum of 15m hashrates across this host and fresh peers (H/s)", [({}, d.get("fleet", {}).get("h15", 0))])
+        metric("dashboard_federation_peer_up", "gauge", "1 if the peer dashboard answered within the staleness window", [
+            ({"peer": url}, int(FEDERATION.fresh(peer))) for url, peer in FEDERATION.peers.items()
+        ])
+        metric("dashboard_federation_peer_latency_seconds", "gauge", "Duration of the last successful peer fetch", [
+            ({"peer": url}, round(peer["latency"], 6)) for url, peer in FEDERATION.peers.items() if peer["latency"] is not None
+        ])
+
+    metric("dashboard_collector_last_success_timestamp_seconds", "gauge", "Unix time of each collector's last successful run", [
+        ({"collector": c.name}, c.last_success) for c in COLLECTORS.values()
+    ])
+    metric("dashboard_collector_up", "gauge", "1 if the collector's last run succeeded", [
+        ({"collector": c.name}, int(c.last_error is None)) for c in COLLECTORS.values()
+    ])
+
+    lines.append("# HELP dashboard_stage_duration_seconds Duration of each collection and render stage")
+    lines.append("# TYPE dashboard_stage_duration_seconds histogram")
+    for stage, h in STAGE_TIMINGS.items():
+        label = metric_label(stage)
+        for bound, count in zip(METRIC_BUCKETS, h.counts):
+            lines.append(f'dashboard_stage_duration_seconds_bucket{{stage="{label}",le="{bound}"}} {count}')
+        lines.append(f'dashboard_stage_duration_seconds_bucket{{stage="{label}",le="+Inf"}} {h.count}')
+        lines.append(f'dashboard_stage_duration_seconds_sum{{stage="{label}"}} {h.sum:.6f}')
+        lines.append(f'dashboard_stage_duration_seconds_count{{stage="{label}"}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+async def handle_history(request):
+    seconds = history_range(request.query.get("range", "24h"))
+    series = request.query.get("series", "total")
+    if series == "fleet" and FEDERATION:
+        range_name = request.query.get("range", "24h")
+        points = await FEDERATION.fleet_history(range_name if range_name in HISTORY_RANGES else "24h")
+        return web.json_response({"series": series, **points})
+    return web.json_response({"series": series, **await run_blocking(history_points, series, seconds)})
+
+async def handle_snapshot(request):
+    if not LATEST_DATA: return web.json_response({"error": "initializing"}, status=503)
+    payload = RENDER_CACHE.get("snapshot", "application/json", lambda: json.dumps(build_view(LATEST_DATA)))
+    return serve_payload(request, payload)
+
+async def handle_compact(request):
+    if not LATEST_DATA: return web.json_response({"error": "initializing"}, status=503)
+    payload = RENDER_CACHE.get("compact", "application/json", lambda: json.dumps(compact_snapshot(LATEST_DATA)))
+    return serve_payload(request, payload)
+
+async def handle_events(request):
+    if not LATEST_DATA: return web.json_response({"error": "initializing"}, status=503)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+    queue = BROADCASTER.subscribe(request.transport)
+    try:
+        view = build_view(LATEST_DATA)
+        BROADCASTER.last_view = BROADCASTER.last_view or view
+        data = f"event: snapshot\ndata: {json.dumps(view)}\n\n".encode()
+        while data is not None:
+            try:
+                # A client that cannot take a message within a heartbeat is stalled; drop it.
+                await asyncio.wait_for(response.write(data), SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                BROADCASTER.drop(queue)
+                break
+            try:
+                data = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                data = b": ping\n\n"
+    except ConnectionResetError:
+        pass
+    finally:
+        BROADCASTER.unsubscribe(queue)
+    return response
+
+def query_int(request, name, default):
+    try: return int(request.query.get(name, default))
+    except ValueError: return default
+
+async def handle_workers(request):
+    table = FLEET_WORKERS if request.query.get("scope") == "fleet" and FEDERATION else WORKERS
+    etag = f'"{table.version}-{hashlib.blake2b(request.query_string.encode(), digest_size=6).hexdigest()}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    result = table.page(
+        sort=request.query.get("sort", "name"), desc=request.query.get("desc") == "1",
+        status=request.query.get("status", ""), q=request.query.get("q", ""),
+        page=query_int(request, "page", 1), per_page=query_int(request, "per_page", WORKERS_PAGE_SIZE)
+    )
+    return web.json_response(result, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+async def handle_metrics(request):
+    return web.Response(text=render_metrics(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+async def handle_get(request):
+    if not LATEST_DATA: return web.Response(text="Initializing data...", status=503)
+    payload = RENDER_CACHE.get("page", "text/html", lambda: render_page(build_view(LATEST_DATA)))
+    return serve_payload(request, payload)
+
+async def handle_static(request):
+    payload = ASSETS.files.get(request.match_info["name"])
+    if not payload: raise web.HTTPNotFound()
+    return serve_payload(request, payload)
+
+async def init_state():
+    """Creates the shared caches, stores and collectors without starting them."""
+    global HISTORY, PROBER, COLLECTORS, STATS_CACHE, ASSETS, RENDER_CACHE, BROADCASTER, WORKERS, FEDERATION, FLEET_WORKERS, BLOCKING_EXECUTOR
+    BLOCKING_EXECUTOR = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix="dashboard-io")
+    ASSETS = StaticAssets(STATIC_DIR)
+    RENDER_CACHE = RenderCache()
+    BROADCASTER = Broadcaster()
+    HISTORY = HistoryStore(HISTORY_DB_PATH)
+    PROBER = XmrigProber()
+    await PROBER.start()
+    STATS_CACHE = StatsFileCache()
+    WORKERS = WorkerTable()
+    FLEET_WORKERS = WorkerTable()
+    FEDERATION = Federation(FEDERATION_PEERS) if FEDERATION_PEERS else None
+    if FEDERATION: await FEDERATION.start()
+    COLLECTORS = build_collectors()
+
+async def close_state():
+    if PROBER: await PROBER.close()
+    if FEDERATION: await FEDERATION.close()
+    if BLOCKING_EXECUTOR: BLOCKING_EXECUTOR.shutdown(wait=True)
+    if HISTORY: HISTORY.close()
 
 async def start_background_tasks(app):
+    await init_state()
     app['data_task'] = asyncio.create_task(update_data_loop())
 
-if __name__ == "__main__":
+async def cleanup_background_tasks(app):
+    if 'data_task' in app: app['data_task'].cancel()
+    await close_state()
+
+def build_app(collect=True):
+    """The dashboard application; collect=False leaves state setup to the caller (benchmarks)."""
     app = web.Application()
-    app.add_routes([web.get('/', handle_get)])
-    app.on_startup.append(start_background_tasks)
-    print("Dashboard running on port 8000 with Background Worker...", flush=True)
-    web.run_app(app, host='0.0.0.0', port=8000)
\ No newline at end of file
+    app.add_routes([
+        web.get('/', handle_get),
+        web.get('/api/snapshot', handle_snapshot),
+        web.get('/api/history', handle_history),
+        web.get('/api/workers', handle_workers),
+        web.get('/api/compact', handle_compact),
+        web.get('/api/events', handle_events),
+        web.get('/metrics', handle_metrics),
+        web.get('/static/{name}', handle_static),
+    ])
+    if collect:
+        app.on_startup.append(start_background_tasks)
+        app.on_cleanup.append(cleanup_background_tasks)
+    return app
+
+if __name__ == "__main__":
+    app = build_app()
+    print(f"Dashboard running on port {DASHBOARD_PORT} with Background Worker...", flush=True)
+    web.run_app(app, host='0.0.0.0', port=DASHBOARD_PORT)
\ No newline at end of file
@@ -0,0 +1,163 @@
+// Keeps the dashboard current by patching the DOM from pushed deltas
+// (/api/events), falling back to polling /api/snapshot.
+(function () {
+    const range = new URLSearchParams(location.search).get('range') || '24h';
+    // Federated dashboards chart and list the whole fleet by default.
+    const series = document.body.dataset.series;
+    const federated = series === 'fleet';
+    const fields = {};
+    document.querySelectorAll('[data-k]').forEach(el => { (fields[el.dataset.k] ||= []).push(el); });
+    const table = { scope: federated ? 'fleet' : 'local', sort: 'name', desc: false, status: '', q: '', page: 1 };
+    const versions = { [table.scope]: Number(document.getElementById('workers').dataset.version) };
+    let chart = null;
+    let chartStep = null;
+
+    function setText(el, text) {
+        text = String(text);
+        if (el.textContent !== text) el.textContent = text;
+    }
+
+    function cell(text, cls) {
+        const td = document.createElement('td');
+        if (cls) td.className = cls;
+        td.textContent = text;
+        return td;
+    }
+
+    function workerRow(w) {
+        const tr = document.createElement('tr');
+        const name = cell(w.name);
+        const dot = document.createElement('span');
+        dot.className = 'dot ' + w.status;
+        name.prepend(dot);
+        tr.append(name);
+        if (federated) tr.append(cell(w.host));
+        tr.append(cell(w.ip), cell(w.up), cell(w.h10), cell(w.h60), cell(w.h15, 'bold'), cell(w.ping));
+        return tr;
+    }
+
+    function hostRow(h) {
+        const tr = document.createElement('tr');
+        const host = cell(h.host);
+        const dot = document.createElement('span');
+        dot.className = 'dot ' + h.status;
+        host.prepend(dot);
+        const status = cell(h.status + ' ');
+        const note = document.createElement('small');
+        note.textContent = h.note;
+        status.append(note);
+        tr.append(host, cell(h.pool), cell(h.hr, 'bold'), cell(h.workers), status);
+        return tr;
+    }
+
+    async function loadWorkers() {
+        const params = new URLSearchParams({ scope: table.scope, sort: table.sort, desc: table.desc ? '1' : '0', status: table.status, q: table.q, page: table.page });
+        try {
+            const res = await fetch('/api/workers?' + params);
+            if (!res.ok) return;
+            const result = await res.json();
+            table.page = result.page;
+            document.getElementById('workers').replaceChildren(...result.rows.map(workerRow));
+            setText(document.getElementById('worker-page'), `Page ${result.page} / ${result.pages} (${result.total})`);
+            document.querySelectorAll('th[data-sort]').forEach(th => {
+                th.classList.toggle('sorted-asc', th.dataset.sort === table.sort && !table.desc);
+                th.classList.toggle('sorted-desc', th.dataset.sort === table.sort && table.desc);
+            });
+        } catch (e) { /* keep the current rows */ }
+    }
+
+    function bindTable() {
+        document.querySelectorAll('th[data-sort]').forEach(th => th.addEventListener('click', () => {
+            table.desc = table.sort === th.dataset.sort ? !table.desc : th.dataset.sort === 'hashrate';
+            table.sort = th.dataset.sort;
+            table.page = 1;
+            loadWorkers();
+        }));
+        let typing = null;
+        document.getElementById('worker-q').addEventListener('input', e => {
+            clearTimeout(typing);
+            typing = setTimeout(() => { table.q = e.target.value; table.page = 1; loadWorkers(); }, 250);
+        });
+        const scope = document.getElementById('worker-scope');
+        if (scope) scope.addEventListener('change', e => { table.scope = e.target.value; table.page = 1; loadWorkers(); });
+        document.getElementById('worker-status').addEventListener('change', e => { table.status = e.target.value; table.page = 1; loadWorkers(); });
+        document.getElementById('worker-prev').addEventListener('click', () => { if (table.page > 1) { table.page--; loadWorkers(); } });
+        document.getElementById('worker-next').addEventListener('click', () => { table.page++; loadWorkers(); });
+    }
+
+    function apply(view) {
+        for (const [key, text] of Object.entries(view.fields || {})) {
+            (fields[key] || []).forEach(el => setText(el, text));
+        }
+        if (view.hp_class !== undefined) document.getElementById('hugepages').className = view.hp_class;
+        if (view.disk_pct !== undefined) {
+            const disk = document.getElementById('disk-fill');
+            disk.style.width = view.disk_pct + '%';
+            disk.className = 'progress-fill ' + (view.disk_pct > 90 ? 'critical' : view.disk_pct > 75 ? 'warning' : '');
+        }
+        if (view.hosts) document.getElementById('fleet-hosts').replaceChildren(...view.hosts.map(hostRow));
+        let reload = false;
+        for (const [scope, key] of [['local', 'workers_version'], ['fleet', 'fleet_workers_version']]) {
+            if (view[key] === undefined || view[key] === versions[scope]) continue;
+            versions[scope] = view[key];
+            reload ||= scope === table.scope;
+        }
+        if (reload) loadWorkers();
+        if (view.history) appendHistory(view.history);
+    }
+
+    function appendHistory(point) {
+        if (!chart || point.series !== series || point.step !== chartStep) return;
+        const labels = chart.data.labels, values = chart.data.datasets[0].data;
+        if (labels.length && chart.lastTs >= point.ts) return;
+        labels.push(point.label);
+        values.push(point.v);
+        chart.lastTs = point.ts;
+        while (labels.length > chart.maxPoints) { labels.shift(); values.shift(); }
+        chart.update('none');
+    }
+
+    async function refresh() {
+        try {
+            const res = await fetch('/api/snapshot');
+            if (res.ok) apply(await res.json());
+        } catch (e) { /* keep showing the last data */ }
+    }
+
+    async function loadChart() {
+        if (typeof Chart === 'undefined') return;
+        try {
+            const res = await fetch('/api/history?series=' + series + '&range=' + encodeURIComponent(range));
+            if (!res.ok) return;
+            const h = await res.json();
+            chartStep = h.step;
+            if (chart) {
+                chart.data.labels = h.labels;
+                chart.data.datasets[0].data = h.values;
+                chart.update('none');
+            } else chart = new Chart(document.getElementById('hChart'), {
+                type: 'line',
+                data: {
+                    labels: h.labels,
+                    datasets: [{ label: 'H/s', data: h.values, borderColor: '#58a6ff', tension: 0.3, fill: true, backgroundColor: 'rgba(88,166,255,0.1)' }]
+                },
+                options: { responsive: true, maintainAspectRatio: false, plugins: { legend: { display: false } }, scales: { y: { grid: { color: '#30363d' } }, x: { display: false } } }
+            });
+            chart.lastTs = h.ts[h.ts.length - 1] || 0;
+            chart.maxPoints = Math.ceil(h.seconds / h.step);
+        } catch (e) { /* retry on the next tick */ }
+    }
+
+    function subscribe() {
+        const events = new EventSource('/api/events');
+        events.addEventListener('snapshot', e => apply(JSON.parse(e.data)));
+        events.addEventListener('delta', e => apply(JSON.parse(e.data)));
+    }
+
+    bindTable();
+    loadChart();
+    if (window.EventSource) subscribe(); else setInterval(refresh, 10000);
+    // Coarser chart tiers are not pushed point by point; reload them periodically.
+    // The fleet series is merged from peers' history, so it is reloaded as often as it is re-merged.
+    setInterval(loadChart, federated ? 60000 : 300000);
+})();
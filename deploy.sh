@@ -39,6 +39,7 @@ sudo chown -R 100:101 "$TOR_DATA_DIR" # Tor user inside container is UID 100
 sudo chown -R $USER:$USER "$MONERO_DIR" "$TARI_DIR" "$P2POOL_DIR"
 mkdir -p "$P2POOL_DIR/stats"
 sudo chmod -R 755 "$P2POOL_DIR/stats"
+mkdir -p "$P2POOL_DIR/dashboard"
 
 # Write a preliminary .env so 'docker compose' has valid volume paths
 cat <<EOF > .env
@@ -74,6 +75,7 @@ MONERO_PASS=$(jq -r .monero.node_password config.json)
 MONERO_WALLET=$(jq -r .monero.wallet_address config.json)
 TARI_WALLET=$(jq -r .tari.wallet_address config.json)
 POOL_TYPE=$(jq -r '.p2pool.pool // "main"' config.json)
+DASHBOARD_PEERS=$(jq -r '(.dashboard.peers // []) | join(",")' config.json)
 P2POOL_FLAGS=""
 P2POOL_PORT="37889"
 if [ "$POOL_TYPE" == "mini" ]; then
@@ -98,6 +100,7 @@ TARI_ONION_ADDRESS=$TARI_ONION
 P2POOL_ONION_ADDRESS=$P2POOL_ONION
 P2POOL_FLAGS=$P2POOL_FLAGS
 P2POOL_PORT=$P2POOL_PORT
+DASHBOARD_PEERS=$DASHBOARD_PEERS
 EOF
 
 # --- 5. Apply Templates ---